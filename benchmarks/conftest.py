@@ -0,0 +1,84 @@
+"""Fixtures for the benchmark suite.
+
+Pages and directories are generated locally (see ``pages.py``), so the
+benchmarks run offline. Besides timing by pytest-benchmark, each benchmark
+records throughput (entries/s), peak traced memory, and the number of memory
+blocks left allocated (by the result), in its ``extra_info`` (see
+``--benchmark-json``) and in a summary table.
+"""
+
+import gc
+import sys
+
+import pytest
+
+from pages import get_rounds
+
+
+try:
+    import tracemalloc
+except ImportError:     # Python 2.
+    tracemalloc = None
+
+
+def trace(func):
+    """Run `func` once under tracemalloc.
+
+    Returns (peak traced bytes, memory blocks still allocated afterwards),
+    or `(None, None)` if tracemalloc is unavailable.
+    """
+    if tracemalloc is None:
+        return None, None
+    gc.collect()
+    blocks = sys.getallocatedblocks()
+    tracemalloc.start()
+    try:
+        result = func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    gc.collect()
+    retained = sys.getallocatedblocks() - blocks
+    del result
+    return peak, retained
+
+
+_results = []
+
+
+@pytest.fixture()
+def measure(benchmark):
+    """Benchmark a function producing `count` entries.
+    """
+    def run(func, count):
+        result = benchmark.pedantic(
+            func, rounds=get_rounds(count), iterations=1, warmup_rounds=1,
+        )
+        if benchmark.stats is None:     # --benchmark-disable.
+            return result
+        peak, blocks = trace(func)
+        info = benchmark.extra_info
+        info["entries"] = count
+        info["entries_per_second"] = count / benchmark.stats.stats.mean
+        info["peak_memory"] = peak
+        info["retained_blocks"] = blocks
+        _results.append((benchmark.name, info))
+        return result
+    return run
+
+
+def pytest_terminal_summary(terminalreporter):
+    if not _results:
+        return
+    write = terminalreporter.write_line
+    terminalreporter.section("entry throughput and memory")
+    width = max(len(name) for name, _ in _results)
+    write("{0:<{w}} {1:>12} {2:>14} {3:>14}".format(
+        "name", "entries/s", "peak bytes", "kept blocks", w=width,
+    ))
+    for name, info in _results:
+        write("{0:<{w}} {1:>12,.0f} {2:>14,} {3:>14,}".format(
+            name, info["entries_per_second"],
+            info["peak_memory"] or 0, info["retained_blocks"] or 0,
+            w=width,
+        ))
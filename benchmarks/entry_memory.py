@@ -0,0 +1,78 @@
+"""Compare memory used by entries in the compact and the plain forms.
+
+Run with ``python benchmarks/entry_memory.py [COUNT]`` (Python 3 only). The
+plain form is what entries used to look like: an `Entry` namedtuple with
+its own name string, hashes dict, `Version` and `SpecifierSet`.
+"""
+
+import gc
+import sys
+import tracemalloc
+
+from packaging.specifiers import SpecifierSet
+from packaging.version import Version
+from packaging_repositories import Endpoint, Entry
+from packaging_repositories.entries import parse_from_html
+
+
+def make_page(count):
+    anchors = []
+    for i in range(count):
+        version = "{0}.{1}.{2}".format(i // 1000, i // 10 % 100, i % 10)
+        anchors.append(
+            '<a href="../../packages/{i:064x}/foo-{v}.tar.gz#sha256={i:064x}" '
+            'data-requires-python="{rp}">foo-{v}.tar.gz</a>'.format(
+                i=i, v=version, rp="&gt;=3.6" if i % 2 else "",
+            ),
+        )
+    return "<html><body>{0}</body></html>".format("\n".join(anchors))
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = build()
+        gc.collect()
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, current
+
+
+def build_compact(page):
+    entries = parse_from_html(page, "https://example.com/simple/foo/", "foo")
+    for entry in entries:   # Resolve everything, like a resolver would.
+        entry.endpoint, entry.hashes, entry.requires_python
+    return entries
+
+
+def build_plain(entries):
+    return [
+        Entry(
+            "".join(entry.name),
+            Version(str(entry.version)),
+            Endpoint(entry.endpoint.local, "".join(entry.endpoint.value)),
+            dict((k, "".join(v)) for k, v in entry.hashes.items()),
+            SpecifierSet(str(entry.requires_python)),
+            "".join(entry.gpg_sig),
+        )
+        for entry in entries
+    ]
+
+
+def main(count):
+    page = make_page(count)
+    compact, compact_size = measure(lambda: build_compact(page))
+    _, plain_size = measure(lambda: build_plain(compact))
+    print("entries: {0}".format(count))
+    print("plain:   {0:>12,} bytes ({1:.0f}/entry)".format(
+        plain_size, plain_size / count,
+    ))
+    print("compact: {0:>12,} bytes ({1:.0f}/entry)".format(
+        compact_size, compact_size / count,
+    ))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,111 @@
+"""Generators of synthetic index pages and directories.
+"""
+
+import json
+import os
+
+
+SIZES = [10, 1000, 10000, 100000]
+
+# (requires-python ratio, hash ratio) of generated anchors.
+DENSITIES = {
+    "pypi": (0.5, 1.0),
+    "bare": (0.0, 0.0),
+    "dense": (1.0, 1.0),
+}
+
+REQUIRES_PYTHONS = [">=2.7", ">=3.6", ">=2.7, !=3.0.*, !=3.1.*, !=3.2.*"]
+
+
+def iter_versions(count):
+    for i in range(count):
+        yield "{0}.{1}.{2}".format(i // 1000, i // 10 % 100, i % 10)
+
+
+def iter_filenames(name, count):
+    for i, version in enumerate(iter_versions(count)):
+        if i % 2:
+            yield "{0}-{1}-py2.py3-none-any.whl".format(name, version)
+        else:
+            yield "{0}-{1}.tar.gz".format(name, version)
+
+
+def _every(i, ratio):
+    # Spread a ratio evenly; _every(i, 0.5) is true for every other i.
+    return int((i + 1) * ratio) != int(i * ratio)
+
+
+def make_anchor(i, name, filename, density):
+    requires_python_ratio, hash_ratio = DENSITIES[density]
+    href = "../../packages/{0:02x}/{1:02x}/{2:060x}/{3}".format(
+        i % 256, i // 256 % 256, i, filename,
+    )
+    if _every(i, hash_ratio):
+        href += "#sha256={0:064x}".format(i)
+    attrs = 'href="{0}"'.format(href)
+    if _every(i, requires_python_ratio):
+        requires_python = REQUIRES_PYTHONS[i % len(REQUIRES_PYTHONS)]
+        attrs += ' data-requires-python="{0}"'.format(
+            requires_python.replace(">", "&gt;"),
+        )
+    return "<a {0}>{1}</a><br/>".format(attrs, filename)
+
+
+def make_simple_page(name, count, density="pypi"):
+    """Generate a PEP 503 project page with `count` anchors.
+    """
+    anchors = (
+        make_anchor(i, name, filename, density)
+        for i, filename in enumerate(iter_filenames(name, count))
+    )
+    return (
+        "<!DOCTYPE html><html><head><title>Links for {0}</title></head>"
+        "<body><h1>Links for {0}</h1>\n{1}\n</body></html>"
+    ).format(name, "\n".join(anchors)).encode("utf-8")
+
+
+def make_json_page(name, count, density="pypi"):
+    """Generate a PEP 691 project page, equivalent to `make_simple_page`.
+    """
+    requires_python_ratio, hash_ratio = DENSITIES[density]
+    files = []
+    for i, filename in enumerate(iter_filenames(name, count)):
+        info = {
+            "filename": filename,
+            "url": "../../packages/{0:060x}/{1}".format(i, filename),
+            "hashes": {},
+        }
+        if _every(i, hash_ratio):
+            info["hashes"]["sha256"] = "{0:064x}".format(i)
+        if _every(i, requires_python_ratio):
+            info["requires-python"] = REQUIRES_PYTHONS[i % 3]
+        files.append(info)
+    document = {"meta": {"api-version": "1.0"}, "name": name, "files": files}
+    return json.dumps(document).encode("utf-8")
+
+
+def make_flat_page(project_count, files_per_project):
+    """Generate a find-links page listing files of many projects.
+    """
+    anchors = []
+    for p in range(project_count):
+        name = "project{0}".format(p)
+        for filename in iter_filenames(name, files_per_project):
+            anchors.append('<a href="{0}">{0}</a>'.format(filename))
+    return "<html><body>{0}</body></html>".format("\n".join(anchors))
+
+
+def make_wheelhouse(root, name, count, other_projects=0):
+    """Fill a directory with empty files, like a wheelhouse.
+    """
+    for filename in iter_filenames(name, count):
+        open(os.path.join(root, filename), "w").close()
+    for p in range(other_projects):
+        other = "other{0}".format(p)
+        for filename in iter_filenames(other, 10):
+            open(os.path.join(root, filename), "w").close()
+
+
+def get_rounds(count):
+    # Enough rounds for stable numbers, without taking forever on big pages.
+    return max(3, min(100, 100000 // max(count, 1)))
@@ -0,0 +1,39 @@
+import subprocess
+import sys
+
+import pytest
+
+
+def get_import_time(module):
+    """Get microseconds spent importing `module` in a new interpreter.
+
+    This is the cumulative time reported by ``python -X importtime``.
+    """
+    output = subprocess.check_output(
+        [sys.executable, "-X", "importtime", "-c", "import " + module],
+        stderr=subprocess.STDOUT,
+    ).decode("utf-8")
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|")
+        if name.strip() == module:
+            return int(cumulative)
+    raise LookupError(module)
+
+
+@pytest.mark.skipif(
+    sys.version_info < (3, 7), reason="-X importtime needs Python 3.7",
+)
+def test_import_time(benchmark):
+    """Time a fresh interpreter importing the package.
+
+    Timing includes interpreter startup; the import itself is recorded in
+    ``extra_info`` (see ``--benchmark-json``).
+    """
+    times = []
+    benchmark.pedantic(
+        lambda: times.append(get_import_time("packaging_repositories")),
+        rounds=5, iterations=1,
+    )
+    benchmark.extra_info["import_microseconds"] = min(times)
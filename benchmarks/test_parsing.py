@@ -0,0 +1,116 @@
+import pytest
+
+from packaging_repositories import (
+    FlatHTMLRepository, LocalDirectoryRepository, RequiresPythonFilter,
+    VersionFilter,
+)
+from packaging_repositories.entries import (
+    iter_from_chunks, list_from_paths, parse_from_file, parse_from_html,
+    parse_from_json,
+)
+
+from pages import (
+    DENSITIES, SIZES, iter_filenames, make_flat_page, make_json_page,
+    make_simple_page, make_wheelhouse,
+)
+
+
+PAGE_URL = "https://pypi.org/simple/foo/"
+
+_pages = {}
+
+
+def get_page(maker, *args):
+    key = (maker,) + args
+    try:
+        return _pages[key]
+    except KeyError:
+        page = _pages[key] = maker(*args)
+        return page
+
+
+def resolve_all(entries):
+    for entry in entries:
+        entry.version, entry.endpoint, entry.hashes, entry.requires_python
+    return entries
+
+
+@pytest.mark.parametrize("density", sorted(DENSITIES))
+@pytest.mark.parametrize("size", SIZES)
+@pytest.mark.parametrize("parser", ["stdlib", "html5lib"])
+def test_parse_html(measure, parser, size, density):
+    html = (get_page(make_simple_page, "foo", size, density), "utf-8")
+    measure(lambda: parse_from_html(html, PAGE_URL, "foo", parser), size)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_parse_html_resolved(measure, size):
+    html = (get_page(make_simple_page, "foo", size), "utf-8")
+    measure(lambda: resolve_all(
+        parse_from_html(html, PAGE_URL, "foo", "stdlib"),
+    ), size)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_parse_html_chunks(measure, size):
+    content = get_page(make_simple_page, "foo", size)
+    chunks = [content[i:i + 16384] for i in range(0, len(content), 16384)]
+    measure(lambda: list(iter_from_chunks(chunks, PAGE_URL, "foo")), size)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_parse_file(measure, tmpdir, size):
+    path = tmpdir.join("index.html")
+    path.write_binary(get_page(make_simple_page, "foo", size))
+    measure(lambda: parse_from_file(str(path), PAGE_URL, "foo"), size)
+
+
+@pytest.mark.parametrize("density", sorted(DENSITIES))
+@pytest.mark.parametrize("size", SIZES)
+def test_parse_json(measure, size, density):
+    data = (get_page(make_json_page, "foo", size, density), "utf-8")
+    measure(lambda: parse_from_json(data, PAGE_URL, "foo"), size)
+
+
+@pytest.mark.parametrize("size", SIZES)
+@pytest.mark.parametrize("parser", ["stdlib", "html5lib"])
+def test_filters(measure, parser, size):
+    html = (get_page(make_simple_page, "foo", size, "dense"), "utf-8")
+    filters = [VersionFilter(">=1.0,<50"), RequiresPythonFilter("3.7")]
+    measure(lambda: parse_from_html(
+        html, PAGE_URL, "foo", parser, filters=filters,
+    ), size)
+
+
+@pytest.mark.parametrize("project_count", [10, 100, 1000])
+def test_flat_page(measure, project_count):
+    html = get_page(make_flat_page, project_count, 10)
+    names = ["project{0}".format(p) for p in range(project_count)]
+
+    def run():
+        repository = FlatHTMLRepository("https://example.com/links.html")
+        return repository.get_entries_many(
+            names, repository.base_endpoint, html,
+        )
+
+    measure(run, project_count * 10)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_wheelhouse(measure, tmpdir, size):
+    root = str(tmpdir)
+    make_wheelhouse(root, "foo", size, other_projects=size // 100)
+
+    def run():
+        repository = LocalDirectoryRepository(root)
+        return repository.get_entries(
+            "foo", repository.base_endpoint, None,
+        )
+
+    measure(run, size)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_list_from_paths(measure, size):
+    paths = list(iter_filenames("foo", size))
+    measure(lambda: list_from_paths(paths, "/wheelhouse", "foo"), size)
@@ -1,18 +1,45 @@
 __all__ = [
     "__version__",
-    "Endpoint", "Entry", "Fetcher",
-    "Filter", "RequiresPythonFilter", "VersionFilter",
+    "AggregateFetcher", "BatchFetcher", "Endpoint", "Entry", "Fetcher",
+    "IncrementalParser", "BestEntries", "EntryTable", "Hashes", "LazyEntry",
+    "SingleFlight", "ThreadPoolFetcher", "Transport",
+    "Filter", "FilterChain", "RequiresPythonFilter", "VersionFilter",
+    "WheelTagFilter",
+    "EntryStore", "ResponseCache", "Instrument", "Metrics",
     "FlatHTMLRepository", "LocalDirectoryRepository", "SimpleRepository",
-    "guess_encoding", "match_egg_info_version",
+    "best", "get_target_tags", "guess_content_type", "guess_encoding",
+    "intern_cache_info", "latest_matching", "match_egg_info_version",
+    "set_default_html_parser",
 ]
 
+import sys
+
+from .caches import EntryStore, ResponseCache
+from .coalescing import SingleFlight
 from .endpoints import Endpoint
-from .entries import Entry
-from .fetchers import Fetcher
-from .filters import Filter, RequiresPythonFilter, VersionFilter
+from .entries import (
+    Entry, Hashes, IncrementalParser, LazyEntry, set_default_html_parser,
+)
+from .fetchers import (
+    AggregateFetcher, BatchFetcher, Fetcher, ThreadPoolFetcher,
+)
+from .filters import (
+    Filter, FilterChain, RequiresPythonFilter, VersionFilter, WheelTagFilter,
+    get_target_tags,
+)
+from .instrumentation import Instrument, Metrics
+from .interning import intern_cache_info
+from .queries import BestEntries, best, latest_matching
 from .repositories import (
     FlatHTMLRepository, LocalDirectoryRepository, SimpleRepository,
 )
-from .utils import guess_encoding, match_egg_info_version
+from .tables import EntryTable
+from .transports import Transport
+from .utils import guess_content_type, guess_encoding, match_egg_info_version
+
+if sys.version_info >= (3, 6):
+    from ._async import AsyncSingleFlight
+    from .fetchers import AsyncFetcher, ConcurrencyLimits
+    __all__ += ["AsyncFetcher", "AsyncSingleFlight", "ConcurrencyLimits"]
 
 __version__ = "0.3.0d1"
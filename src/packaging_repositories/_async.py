@@ -0,0 +1,248 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Asynchronous implementations, only imported on Python 3.6 or later.
+
+asyncio is imported where it is used, since importing it is slow, and
+most users of the package never need it.
+"""
+
+import functools
+
+from timeit import default_timer
+
+from .transports import read_local
+
+
+class AsyncFilterMixin(object):
+    """Implement the async iterator protocol for ``_Filter``.
+    """
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        while True:
+            value = await self.iterator.__anext__()
+            if self.func(value):
+                return value
+
+
+class ConcurrencyLimits(object):
+    """Limits on concurrent requests, shared between async fetchers.
+
+    At most `total` requests are in flight at any time, and at most
+    `per_host` to the same host. Semaphores are created lazily, so they are
+    bound to the event loop the fetchers run in.
+    """
+    def __init__(self, total=100, per_host=10):
+        self.total = total
+        self.per_host = per_host
+        self._total_semaphore = None
+        self._host_semaphores = {}
+
+    def __repr__(self):
+        return "ConcurrencyLimits(total={0!r}, per_host={1!r})".format(
+            self.total, self.per_host,
+        )
+
+    def _get_semaphores(self, host):
+        import asyncio
+        if self._total_semaphore is None:
+            self._total_semaphore = asyncio.Semaphore(self.total)
+        try:
+            host_semaphore = self._host_semaphores[host]
+        except KeyError:
+            host_semaphore = asyncio.Semaphore(self.per_host)
+            self._host_semaphores[host] = host_semaphore
+        return self._total_semaphore, host_semaphore
+
+    async def acquire(self, host):
+        total_semaphore, host_semaphore = self._get_semaphores(host)
+        await host_semaphore.acquire()
+        try:
+            await total_semaphore.acquire()
+        except BaseException:
+            host_semaphore.release()
+            raise
+
+    def release(self, host):
+        total_semaphore, host_semaphore = self._get_semaphores(host)
+        total_semaphore.release()
+        host_semaphore.release()
+
+
+class _AsyncCall(object):
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task):
+        self.task = task
+        self.waiters = 0
+
+
+class AsyncSingleFlight(object):
+    """Coalesce concurrent coroutine calls with the same key into one.
+
+    This is the asyncio counterpart of `SingleFlight`, meant to be shared
+    between fetchers running in the same event loop, e.g. by passing it as
+    `flight` to each `AsyncFetcher`.
+
+    The shared call runs in a task. A caller being cancelled does not cancel
+    it for other callers; the task is only cancelled when no caller is left
+    waiting for it.
+    """
+    def __init__(self):
+        self._calls = {}
+        self.calls = 0
+        self.deduplicated = 0
+
+    def __repr__(self):
+        return "AsyncSingleFlight(calls={0!r}, deduplicated={1!r})".format(
+            self.calls, self.deduplicated,
+        )
+
+    def _finish(self, key, call, task):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()    # Retrieved, even if nobody is waiting.
+
+    async def do(self, key, func, *args):
+        """Await ``func(*args)``, unless a call with `key` is in flight.
+        """
+        import asyncio
+        self.calls += 1
+        call = self._calls.get(key)
+        if call is None:
+            call = self._calls[key] = _AsyncCall(
+                asyncio.ensure_future(func(*args)),
+            )
+            call.task.add_done_callback(
+                functools.partial(self._finish, key, call),
+            )
+        else:
+            self.deduplicated += 1
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if not call.waiters and not call.task.done():
+                call.task.cancel()
+
+
+def _get_host(endpoint):
+    return endpoint.value.split("/", 3)[2]
+
+
+class AsyncFetcherMixin(object):
+    """Implement the async iterator protocol for ``AsyncFetcher``.
+    """
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self._iterator is None:
+            self._iterator = self._iter_entries_async()
+        return await self._iterator.__anext__()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+
+    async def aclose(self):
+        """Stop iterating, and cancel all outstanding requests.
+        """
+        if self._iterator is not None:
+            await self._iterator.aclose()
+
+    async def _fetch(self, endpoint):
+        if self._flight is None:
+            return await self._fetch_uncoalesced(endpoint)
+        key = ("fetch", endpoint, self._repository.accept_header)
+        return await self._flight.do(key, self._fetch_uncoalesced, endpoint)
+
+    async def _fetch_uncoalesced(self, endpoint):
+        import asyncio
+        loop = asyncio.get_event_loop()
+        if endpoint.local:
+            return await loop.run_in_executor(None, read_local, endpoint)
+        accept = self._repository.accept_header
+        headers = {"Accept": accept} if accept else {}
+        cache = self._cache
+        instrument = self._instrument
+        cached = None
+        if cache is not None:
+            cached = await loop.run_in_executor(
+                None, cache.get, endpoint.value, accept,
+            )
+            if cached is not None:
+                if cache.is_fresh(cached):
+                    if instrument is not None:
+                        instrument.on_cache("responses", True)
+                    return cached.response
+                headers.update(cached.get_validators())
+        host = _get_host(endpoint)
+        await self._limits.acquire(host)
+        try:
+            if instrument is not None:
+                start = default_timer()
+            response = await self._transport(endpoint, headers)
+            if instrument is not None:
+                instrument.on_fetch(
+                    endpoint.value, default_timer() - start,
+                    len(response.content or b""), response.status,
+                )
+        finally:
+            self._limits.release(host)
+        if cache is not None:
+            if instrument is not None:
+                instrument.on_cache(
+                    "responses", cached is not None and response.status == 304,
+                )
+            response = await loop.run_in_executor(
+                None, cache.update, endpoint.value, accept, response, cached,
+            )
+        return response
+
+    async def _get_entries(self, endpoint):
+        response = await self._fetch(endpoint)
+        if response.status == 404:  # Package does not exist.
+            return []
+        response.raise_for_status()
+        return list(self.iter_entries(
+            endpoint, response.source,
+            content_type=response.content_type, filters=self._filters,
+        ))
+
+    async def _get_entries_coalesced(self, endpoint):
+        repository = self._repository
+        key = (
+            "entries", type(repository), repository.base_endpoint,
+            self._package_name, endpoint, self._filters,
+        )
+        return await self._flight.do(key, self._get_entries, endpoint)
+
+    async def _iter_entries_async(self):
+        import asyncio
+        if self._flight is None:
+            get_entries = self._get_entries
+        else:
+            get_entries = self._get_entries_coalesced
+        tasks = [
+            asyncio.ensure_future(get_entries(endpoint))
+            for endpoint in self.iter_endpoints()
+        ]
+        try:
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED,
+                )
+                for task in done:
+                    for entry in task.result():
+                        yield entry
+        finally:
+            for task in tasks:
+                task.cancel()
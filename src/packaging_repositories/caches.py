@@ -0,0 +1,327 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import errno
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import zlib
+
+from packaging.utils import canonicalize_name
+
+from .transports import Response, _make_headers
+
+
+# Response headers worth keeping in the cache.
+_CACHED_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+
+
+def _replace(src, dst):
+    try:
+        replace = os.replace
+    except AttributeError:  # Python 2.
+        if os.name == "nt" and os.path.exists(dst):
+            os.remove(dst)
+        replace = os.rename
+    replace(src, dst)
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError as e:
+        if e.errno != errno.ENOENT:
+            raise
+
+
+class CachedResponse(object):
+    """A response read from a `ResponseCache`.
+    """
+    __slots__ = ("response", "stored")
+
+    def __init__(self, response, stored):
+        self.response = response
+        self.stored = stored
+
+    def __repr__(self):
+        return "CachedResponse({0!r}, stored={1!r})".format(
+            self.response, self.stored,
+        )
+
+    def get_age(self):
+        return time.time() - self.stored
+
+    def get_validators(self):
+        """Headers to make a conditional request to revalidate this.
+        """
+        headers = {}
+        etag = self.response.headers.get("ETag")
+        if etag:
+            headers["If-None-Match"] = etag
+        last_modified = self.response.headers.get("Last-Modified")
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        return headers
+
+
+class ResponseCache(object):
+    """An on-disk cache of index pages, revalidated with conditional requests.
+
+    Each response is stored as one file in `directory`, keyed by URL and the
+    Accept header sent. A response younger than `max_age` seconds is reused
+    without making a request; an older one is revalidated with its ETag and
+    Last-Modified values, and reused if the server responds 304.
+
+    The cache is kept below `max_size` bytes by evicting the least recently
+    used responses. Files are written atomically (to a temporary file, then
+    renamed into place), so several processes can share a cache directory.
+    """
+    def __init__(self, directory, max_age=0, max_size=100 * 1024 * 1024):
+        self.directory = directory
+        self.max_age = max_age
+        self.max_size = max_size
+
+    def __repr__(self):
+        return "ResponseCache({0!r}, max_age={1!r}, max_size={2!r})".format(
+            self.directory, self.max_age, self.max_size,
+        )
+
+    def _get_path(self, url, accept):
+        key = "{0}\0{1}".format(url, accept or "").encode("utf-8")
+        return os.path.join(self.directory, hashlib.sha256(key).hexdigest())
+
+    def get(self, url, accept=None):
+        """Look up a cached response, or return `None` on a miss.
+        """
+        path = self._get_path(url, accept)
+        try:
+            with open(path, "rb") as f:
+                metadata = json.loads(f.readline().decode("utf-8"))
+                content = f.read()
+            os.utime(path, None)    # Mark as recently used.
+        except (IOError, OSError, ValueError):
+            return None
+        if metadata.get("url") != url:
+            return None
+        response = Response(
+            url, 200, _make_headers(metadata["headers"]), content,
+        )
+        return CachedResponse(response, metadata["stored"])
+
+    def is_fresh(self, cached):
+        return cached.get_age() < self.max_age
+
+    def store(self, url, accept, response):
+        """Store a successful response.
+        """
+        if not os.path.isdir(self.directory):
+            try:
+                os.makedirs(self.directory)
+            except OSError as e:
+                if e.errno != errno.EEXIST:
+                    raise
+        metadata = {
+            "url": url,
+            "stored": time.time(),
+            "headers": [
+                (key, response.headers[key]) for key in _CACHED_HEADERS
+                if response.headers.get(key)
+            ],
+        }
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(json.dumps(metadata).encode("utf-8"))
+                f.write(b"\n")
+                f.write(response.content)
+            _replace(temp_path, self._get_path(url, accept))
+        except BaseException:
+            _remove(temp_path)
+            raise
+        self.evict()
+
+    def update(self, url, accept, response, cached=None):
+        """Update the cache with a response to a (conditional) request.
+
+        Returns the response to use: the cached one if the server responded
+        304 Not Modified, otherwise `response` itself.
+        """
+        if response.status == 304 and cached is not None:
+            self.store(url, accept, cached.response)
+            return cached.response
+        if response.status == 200 and response.content is not None:
+            self.store(url, accept, response)
+        return response
+
+    def evict(self):
+        """Remove least recently used responses to fit in `max_size`.
+        """
+        files = []
+        total = 0
+        for name in os.listdir(self.directory):
+            if name.endswith(".tmp"):   # Being written by someone.
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:     # Removed by another process.
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+        files.sort()
+        for _, size, path in files:
+            if total <= self.max_size:
+                break
+            _remove(path)
+            total -= size
+
+    def clear(self):
+        if not os.path.isdir(self.directory):
+            return
+        for name in os.listdir(self.directory):
+            _remove(os.path.join(self.directory, name))
+
+
+# Bump this when the row format changes; existing stores are then cleared.
+_ENTRY_STORE_SCHEMA_VERSION = 1
+
+
+class EntryStore(object):
+    """A persistent store of parsed entries, backed by an SQLite database.
+
+    Entries are saved per page (or directory listing) and package, keyed by
+    the page's location and a digest of its content, so a page seen before
+    is not parsed again, even in a later process. Pass this as `store` into
+    `parse_from_html` or `list_from_paths`, or into a repository.
+
+    Entries are saved in a compact form (compressed JSON rows of strings),
+    and loaded as `LazyEntry` instances. The store is kept below `max_size`
+    bytes (of saved rows) by evicting the least recently used pages.
+
+    The database is cleared when it was written with a different schema, so
+    upgrading the library does not need any manual cleanup.
+    """
+    def __init__(self, path, max_size=50 * 1024 * 1024):
+        self.path = path
+        self.max_size = max_size
+        self._connection = None
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return "EntryStore({0!r}, max_size={1!r})".format(
+            self.path, self.max_size,
+        )
+
+    def _connect(self):
+        if self._connection is not None:
+            return self._connection
+        import sqlite3  # Not needed until the store is used.
+        directory = os.path.dirname(os.path.abspath(self.path))
+        if not os.path.isdir(directory):
+            try:
+                os.makedirs(directory)
+            except OSError as e:
+                if e.errno != errno.EEXIST:
+                    raise
+        connection = sqlite3.connect(
+            self.path, timeout=30, check_same_thread=False,
+        )
+        with connection:
+            schema, = connection.execute("PRAGMA user_version").fetchone()
+            if schema != _ENTRY_STORE_SCHEMA_VERSION:
+                connection.execute("DROP TABLE IF EXISTS entries")
+                connection.execute(
+                    "PRAGMA user_version = {0:d}".format(
+                        _ENTRY_STORE_SCHEMA_VERSION,
+                    ),
+                )
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    location TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    identity TEXT NOT NULL,
+                    data BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    used REAL NOT NULL,
+                    PRIMARY KEY (location, name)
+                )
+            """)
+        self._connection = connection
+        return connection
+
+    def load(self, location, package_name, identity):
+        """Load saved rows, or return `None` on a miss.
+
+        A miss is also returned if the page content has changed since the
+        rows were saved.
+        """
+        key = (location, canonicalize_name(package_name))
+        with self._lock:
+            connection = self._connect()
+            row = connection.execute(
+                "SELECT identity, data FROM entries "
+                "WHERE location = ? AND name = ?",
+                key,
+            ).fetchone()
+            if row is None or row[0] != identity:
+                return None
+            with connection:
+                connection.execute(
+                    "UPDATE entries SET used = ? "
+                    "WHERE location = ? AND name = ?",
+                    (time.time(),) + key,
+                )
+        return json.loads(zlib.decompress(bytes(row[1])).decode("utf-8"))
+
+    def save(self, location, package_name, identity, rows):
+        """Save rows of a page, replacing ones of its old content.
+        """
+        import sqlite3
+        data = zlib.compress(
+            json.dumps(rows, separators=(",", ":")).encode("utf-8"),
+        )
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO entries "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        location, canonicalize_name(package_name), identity,
+                        sqlite3.Binary(data), len(data), time.time(),
+                    ),
+                )
+                self._evict(connection)
+
+    def _evict(self, connection):
+        total, = connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM entries",
+        ).fetchone()
+        if total <= self.max_size:
+            return
+        rows = connection.execute(
+            "SELECT location, name, size FROM entries ORDER BY used",
+        ).fetchall()
+        for location, name, size in rows:
+            if total <= self.max_size:
+                break
+            connection.execute(
+                "DELETE FROM entries WHERE location = ? AND name = ?",
+                (location, name),
+            )
+            total -= size
+
+    def clear(self):
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.execute("DELETE FROM entries")
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
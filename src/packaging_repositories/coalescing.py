@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Share work between concurrent callers asking for the same thing.
+"""
+
+import sys
+import threading
+
+import six
+
+
+class _Call(object):
+    __slots__ = ("done", "result", "exc_info")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.exc_info = None
+
+
+class SingleFlight(object):
+    """Coalesce concurrent calls with the same key into one.
+
+    While a call for a key is in flight, other calls with an equal key wait
+    for it and receive its result (or exception), instead of doing the work
+    again. Results are not kept after the call finishes; this only removes
+    duplicated work, and is not a cache.
+
+    This is thread-safe, and meant to be shared between fetchers, e.g. by
+    passing it as `flight` to each `ThreadPoolFetcher`. `calls` counts all
+    calls made, and `deduplicated` those that joined a call in flight.
+    """
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.deduplicated = 0
+
+    def __repr__(self):
+        return "SingleFlight(calls={0!r}, deduplicated={1!r})".format(
+            self.calls, self.deduplicated,
+        )
+
+    def do(self, key, func, *args):
+        """Call ``func(*args)``, unless a call with `key` is in flight.
+        """
+        with self._lock:
+            self.calls += 1
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                leader = True
+            else:
+                self.deduplicated += 1
+                leader = False
+        if not leader:
+            call.done.wait()
+            if call.exc_info is not None:
+                six.reraise(*call.exc_info)
+            return call.result
+        try:
+            call.result = func(*args)
+        except BaseException:
+            call.exc_info = sys.exc_info()
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
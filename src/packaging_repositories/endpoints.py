@@ -32,6 +32,15 @@ class Endpoint(object):
             return NotImplemented
         return self.local == other.local and self.value == other.value
 
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+        return not result
+
+    def __hash__(self):
+        return hash((self.local, self.value))
+
     @classmethod
     def from_url(cls, url):
         if not isinstance(url, tuple):
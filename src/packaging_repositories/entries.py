@@ -1,21 +1,30 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import binascii
 import collections
+import json
+import mmap
 import os
 import sys
 import re
 
-import html5lib
-import packaging.specifiers
-import packaging.version
 import six
 
+from six.moves import collections_abc
+
 from .endpoints import Endpoint
-from .utils import (
-    WHEEL_EXTENSION, WHEEL_FILENAME_RE,
-    match_egg_info_version, package_names_match, split_entry_ext,
+from .filenames import get_filename_matcher
+from .filters import compile_filters
+from .instrumentation import CountingFilter, Stopwatch
+from .interning import (
+    InternCache, get_empty_specifier, intern_specifier, intern_string,
+    intern_version,
+)
+from .parsers import (
+    AnchorStream, decode_html, scan_anchor_bytes, scan_anchors,
 )
+from .utils import _get_content_identity
 
 
 # Taken from distlib.compat (to match pip's implementation).
@@ -41,56 +50,196 @@ def _parse_base_url(document, transport_url):
     return transport_url
 
 
-def _parse_version(filename, package_name):
-    stem, ext = split_entry_ext(filename)
-    if ext == WHEEL_EXTENSION:
-        match = WHEEL_FILENAME_RE.match(filename)
-        if not match:
-            raise ValueError("invald wheel name {0!r}".format(filename))
-        wheel_name, vers = match.group("name", "ver")
-        if not package_names_match(package_name, wheel_name):
-            raise ValueError("invald wheel {0!r} for package {1!r}".format(
-                filename, package_name,
-            ))
-    else:
-        vers = match_egg_info_version(stem, package_name)
-        if vers is None:
-            raise ValueError("invalid filename {0!r}".format(filename))
-    return packaging.version.parse(vers)
-
-
 CLEAN_URL_RE = re.compile(r'[^a-z0-9$&+,/:;=?@.#%_\\|-]', re.IGNORECASE)
 
 HASH_RE = re.compile(r'(sha1|sha224|sha384|sha256|sha512|md5)=([a-f0-9]+)')
 
 
-def _iter_entries(document, base_url, package_name):
-    for anchor in document.findall(".//a"):
+def _split_url(base_url, href):
+    url = CLEAN_URL_RE.sub(
+        lambda match: "%{:2x}".format(ord(match.group(0))),
+        six.moves.urllib_parse.urljoin(base_url, href),
+    )
+    return six.moves.urllib_parse.urlsplit(url)
+
+
+class _URLResolver(object):
+    """Resolve hrefs on a page into endpoints.
+
+    The base URL is split once, so each href can usually be resolved with a
+    few string operations. Hrefs that are already clean (nothing to quote,
+    no query, and only leading ``../`` segments), like those on PyPI, are
+    joined directly; anything else goes through `_split_url`.
+    """
+    __slots__ = ("base_url", "_prefix", "_directories")
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self._prefix = None
+        self._directories = None
+        split_result = six.moves.urllib_parse.urlsplit(base_url)
+        if split_result.scheme not in ("http", "https"):
+            return
+        if not split_result.netloc or CLEAN_URL_RE.search(base_url):
+            return
+        directories = split_result.path.split("/")[:-1] or [""]
+        if directories[0] or any(
+                d in ("", ".", "..") for d in directories[1:]):
+            return  # Not normalized; let urljoin deal with it.
+        self._prefix = "{0}://{1}".format(
+            split_result.scheme, split_result.netloc,
+        )
+        self._directories = directories
+
+    def __repr__(self):
+        return "_URLResolver({0!r})".format(self.base_url)
+
+    def _join_clean(self, href):
+        if href.startswith(("https://", "http://")):
+            return href
+        if self._directories is None or ":" in href:
+            return None
+        if href.startswith("/"):
+            if href.startswith("//"):
+                return None
+            directories, path = [""], href[1:]
+        else:
+            directories, path = self._directories, href
+        parents = 0
+        while path.startswith("../"):
+            parents += 1
+            path = path[3:]
+        if parents >= len(directories) or path.startswith("#"):
+            return None
+        if "./" in path or "//" in path or path in (".", ".."):
+            return None
+        if path.endswith(("/.", "/..")):
+            return None
+        return "{0}{1}/{2}".format(
+            self._prefix,
+            "/".join(directories[:len(directories) - parents]),
+            path,
+        )
+
+    def resolve(self, href):
+        """Resolve an href into a 2-tuple (endpoint, fragment).
+        """
+        if "?" not in href and not CLEAN_URL_RE.search(href):
+            url = self._join_clean(href)
+            if url is not None:
+                url, _, fragment = url.partition("#")
+                return Endpoint(False, url), fragment
+        split_result = _split_url(self.base_url, href)
+        return Endpoint.from_url(split_result), split_result.fragment
+
+
+# Resolvers are shared by entries on the same page (and pages with the same
+# base URL), so the base URL is only split once.
+_get_url_resolver = InternCache(_URLResolver, maxsize=256)
+
+
+def _unescape(value):
+    if "&" not in value:
+        return value
+    return unescape(value)
+
+
+def _iter_entries(anchors, base_url, package_name, entry_filter=None):
+    resolver = _get_url_resolver(base_url)
+    match_version = get_filename_matcher(package_name).match_version
+    for anchor in anchors:
         href = anchor.get("href")
-        if not href:
+        if not href or not anchor.text:
             continue
-        try:
-            version = _parse_version(anchor.text, package_name)
-        except ValueError:
+        version = match_version(anchor.text)
+        if version is None:
             continue
-        url = CLEAN_URL_RE.sub(
-            lambda match: "%{:2x}".format(ord(match.group(0))),
-            six.moves.urllib_parse.urljoin(base_url, href),
-        )
-        split_result = six.moves.urllib_parse.urlsplit(url)
-        hashes = dict(
-            match.group(1, 2)
-            for match in HASH_RE.finditer(split_result.fragment)
-        )
-        endpoint = Endpoint.from_url(split_result)
-        requires_python = packaging.specifiers.SpecifierSet(
-            unescape(anchor.get("data-requires-python", "")),
-        )
-        gpg_sig = unescape(anchor.get("data-gpg-sig", ""))
-        yield Entry(
-            package_name, version, endpoint,
-            hashes, requires_python, gpg_sig,
+        if entry_filter and not entry_filter.match_version_string(version):
+            continue
+        requires_python = _unescape(anchor.get("data-requires-python", ""))
+        if entry_filter and not entry_filter.match_requires_python_string(
+                requires_python):
+            continue
+        gpg_sig = _unescape(anchor.get("data-gpg-sig", ""))
+        entry = LazyEntry(
+            package_name, version, href,
+            None, requires_python, gpg_sig,
+            base_url=resolver,
         )
+        if entry_filter and not entry_filter.match_entry(entry):
+            continue
+        yield entry
+
+
+_HEX_DIGEST_RE = re.compile(r"^(?:[0-9a-f]{2})+$")
+
+
+def _pack_digest(value):
+    # Only on Python 3, where raw bytes can be told apart from text.
+    if six.PY3 and isinstance(value, str) and _HEX_DIGEST_RE.match(value):
+        return binascii.unhexlify(value)
+    return value    # Otherwise kept as-is, to round-trip exactly.
+
+
+def _unpack_digest(value):
+    if six.PY3 and isinstance(value, bytes):
+        return binascii.hexlify(value).decode("ascii")
+    return value
+
+
+class Hashes(collections_abc.Mapping):
+    """An immutable mapping of hash names to hex digests.
+
+    This works like the ``{hashname: hexdigest}`` dict it replaces (and
+    compares equal to one), but is much smaller: items are kept in a tuple,
+    hash names are interned, and digests are stored as raw bytes (half the
+    size of hex strings) on Python 3. Use `make_hashes` to create instances,
+    so entries without hashes share one empty instance.
+    """
+    __slots__ = ("_items",)
+
+    def __init__(self, items=()):
+        if isinstance(items, collections_abc.Mapping):
+            items = items.items()
+        else:   # Like dict(), the last duplicate wins.
+            items = collections.OrderedDict(items).items()
+        self._items = tuple(
+            (intern_string(name), _pack_digest(digest))
+            for name, digest in items
+        )
+
+    def __repr__(self):
+        return "Hashes({0!r})".format(dict(self))
+
+    def __reduce__(self):
+        return (type(self), (dict(self),))
+
+    def __getitem__(self, key):
+        for name, digest in self._items:
+            if name == key:
+                return _unpack_digest(digest)
+        raise KeyError(key)
+
+    def __iter__(self):
+        for name, _ in self._items:
+            yield name
+
+    def __len__(self):
+        return len(self._items)
+
+
+EMPTY_HASHES = Hashes()
+
+
+def make_hashes(items=()):
+    """Create a `Hashes` mapping from a dict or an iterable of 2-tuples.
+    """
+    if isinstance(items, Hashes):
+        return items
+    hashes = Hashes(items)
+    if not hashes:
+        return EMPTY_HASHES
+    return hashes
 
 
 Entry = collections.namedtuple("Entry", [
@@ -107,7 +256,256 @@ This would be an anchor tag in an HTML file, or a file in a directory.
 """
 
 
-def parse_from_html(html, page_url, package_name):
+class LazyEntry(object):
+    """An entry that parses its fields when they are first accessed.
+
+    This works like `Entry` (attribute access, tuple unpacking, indexing, and
+    comparison against `Entry` instances), but avoids work for entries that
+    are filtered out before some fields are ever looked at.
+
+    `version` and `requires_python` may be given as strings, to be parsed on
+    access. `endpoint` may be given as a URL (relative to `base_url`); the
+    `Endpoint` is created on access, and `hashes` taken from its fragment if
+    `hashes` is `None`.
+
+    To keep many entries in memory cheaply, the name and gpg-sig strings are
+    interned, hashes are stored in a compact `Hashes` mapping, and entries
+    without requires-python share one empty specifier set.
+
+    Entries may be read from multiple threads at once, e.g. when a parse is
+    shared by coalesced fetchers. A field may then be parsed more than once,
+    but every thread sees the same value.
+    """
+    __slots__ = (
+        "name", "_version", "_endpoint", "_href", "_hashes",
+        "_requires_python", "gpg_sig", "_resolver",
+    )
+
+    _fields = Entry._fields
+
+    def __init__(
+            self, name, version, endpoint, hashes, requires_python, gpg_sig,
+            base_url=None):
+        self.name = intern_string(name)
+        self._version = version
+        self._hashes = None if hashes is None else make_hashes(hashes)
+        self._requires_python = requires_python
+        self.gpg_sig = intern_string(gpg_sig)
+        if not isinstance(endpoint, six.string_types):
+            self._endpoint = endpoint
+            self._href = None
+            self._resolver = None
+            return
+        # Resolved on access. The href is kept apart from the endpoint, so
+        # threads resolving at the same time never see one for the other.
+        self._endpoint = None
+        self._href = endpoint
+        if isinstance(base_url, _URLResolver):
+            self._resolver = base_url
+        else:
+            self._resolver = _get_url_resolver(base_url or "")
+
+    def __repr__(self):
+        return "LazyEntry({0})".format(", ".join(
+            "{0}={1!r}".format(field, value)
+            for field, value in zip(self._fields, self)
+        ))
+
+    def __iter__(self):
+        for field in self._fields:
+            yield getattr(self, field)
+
+    def __len__(self):
+        return len(self._fields)
+
+    def __getitem__(self, index):
+        return tuple(self)[index]
+
+    def __eq__(self, other):
+        if not isinstance(other, (tuple, LazyEntry)):
+            return NotImplemented
+        return tuple(self) == tuple(other)
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+        return not result
+
+    __hash__ = None     # Not hashable, like an Entry with its hashes dict.
+
+    def _asdict(self):
+        return collections.OrderedDict(zip(self._fields, self))
+
+    def _replace(self, **kwargs):
+        return Entry(*self)._replace(**kwargs)
+
+    def _resolve_url(self):
+        # Fields are published before the resolver is cleared, so a thread
+        # seeing no resolver also sees them. Resolving twice is harmless.
+        resolver = self._resolver
+        if resolver is None:
+            return
+        endpoint, fragment = resolver.resolve(self._href)
+        if self._hashes is None:
+            self._hashes = make_hashes(
+                match.group(1, 2) for match in HASH_RE.finditer(fragment)
+            ) if fragment else EMPTY_HASHES
+        self._endpoint = endpoint
+        self._resolver = None
+
+    @property
+    def version(self):
+        value = self._version
+        if isinstance(value, six.string_types):
+            value = self._version = intern_version(value)
+        return value
+
+    @property
+    def endpoint(self):
+        self._resolve_url()
+        return self._endpoint
+
+    @property
+    def hashes(self):
+        self._resolve_url()
+        return self._hashes
+
+    @property
+    def requires_python(self):
+        value = self._requires_python
+        if isinstance(value, six.string_types):
+            if value:
+                value = intern_specifier(value)
+            else:
+                value = get_empty_specifier()
+            self._requires_python = value
+        return value
+
+
+HTML5LIB = "html5lib"
+STDLIB = "stdlib"
+
+_default_html_parser = HTML5LIB
+
+
+def set_default_html_parser(parser):
+    """Set the parser `parse_from_html` uses when none is passed explicitly.
+
+    `parser` should be either ``"html5lib"`` (the default), which builds a
+    full DOM to parse the document strictly, or ``"stdlib"``, which runs the
+    standard library's HTML tokenizer to pick out only ``<base>`` and ``<a>``
+    tags. The latter is much faster on large pages, and falls back to
+    html5lib if the tokenizer fails.
+    """
+    global _default_html_parser
+    if parser not in (HTML5LIB, STDLIB):
+        raise ValueError("unknown parser {0!r}".format(parser))
+    _default_html_parser = parser
+
+
+def _parse_anchors_html5lib(html, page_url):
+    import html5lib     # Slow to import, and not needed by the stdlib parser.
+    kwargs = {"namespaceHTMLElements": False}
+    if not isinstance(html, six.string_types):
+        html, kwargs["transport_encoding"] = html
+    document = html5lib.parse(html, **kwargs)
+    base_url = _parse_base_url(document, page_url)
+    return base_url, document.findall(".//a")
+
+
+def _parse_anchors_stdlib(html, page_url):
+    if not isinstance(html, six.string_types):
+        html = decode_html(*html)
+    scanner = scan_anchors(html)
+    return scanner.base_href or page_url, scanner.anchors
+
+
+def _parse_anchors(html, page_url, parser):
+    if parser is None:
+        parser = _default_html_parser
+    if parser == STDLIB:
+        try:
+            return _parse_anchors_stdlib(html, page_url)
+        except Exception:   # Let html5lib deal with it strictly.
+            pass
+    elif parser != HTML5LIB:
+        raise ValueError("unknown parser {0!r}".format(parser))
+    return _parse_anchors_html5lib(html, page_url)
+
+
+def _dump_entry(entry):
+    """Convert a parsed entry into a row to save in an `EntryStore`.
+
+    Version and requires-python are kept as strings, so loading a row does
+    not need to parse them until they are accessed.
+    """
+    version = entry._version
+    if not isinstance(version, six.string_types):
+        version = str(version)
+    requires_python = entry._requires_python
+    if requires_python is not None and not isinstance(
+            requires_python, six.string_types):
+        requires_python = str(requires_python)
+    endpoint = entry.endpoint
+    return [
+        version, endpoint.local, endpoint.value,
+        dict(entry.hashes), requires_python, entry.gpg_sig,
+    ]
+
+
+def _iter_stored_entries(rows, package_name, entry_filter=None):
+    for version, local, value, hashes, requires_python, gpg_sig in rows:
+        if entry_filter and not entry_filter.match_version_string(version):
+            continue
+        if entry_filter and not entry_filter.match_requires_python_string(
+                requires_python):
+            continue
+        entry = LazyEntry(
+            package_name, version, Endpoint(local, value),
+            hashes, requires_python, gpg_sig,
+        )
+        if entry_filter and not entry_filter.match_entry(entry):
+            continue
+        yield entry
+
+
+def _get_stored_entries(
+        store, location, identity, package_name, entry_filter, parse,
+        instrument=None):
+    """Load entries from `store`, or call `parse` and save its result.
+
+    All entries are saved unfiltered, so the same rows can serve lookups
+    with different filters. Filters are applied to the rows afterwards.
+    """
+    rows = store.load(location, package_name, identity)
+    if instrument is not None:
+        instrument.on_cache("entries", rows is not None)
+    if rows is None:
+        rows = [_dump_entry(entry) for entry in parse()]
+        store.save(location, package_name, identity, rows)
+    return list(_iter_stored_entries(rows, package_name, entry_filter))
+
+
+def _get_source_size(source):
+    if isinstance(source, tuple):
+        return len(source[0])
+    return len(source)
+
+
+def _report_parse(
+        instrument, location, kind, size, candidates, entries, stopwatch,
+        entry_filter):
+    instrument.on_parse(
+        location, kind, size, candidates, len(entries), stopwatch.timings,
+    )
+    if isinstance(entry_filter, CountingFilter):
+        entry_filter.report(instrument)
+
+
+def parse_from_html(
+        html, page_url, package_name, parser=None, filters=(), store=None,
+        instrument=None):
     """Parse entries from HTML source.
 
     `html` should be valid HTML 5 content. This could be either text, or a
@@ -117,34 +515,296 @@ def parse_from_html(html, page_url, package_name):
     the callee does not have this information.
 
     `package_name` should be the name of the package on this page.
+
+    `parser` chooses how the document is parsed; see
+    `set_default_html_parser` for possible values. The default parser is
+    used if this is `None`.
+
+    `filters` is a sequence of `Filter` instances. Entries not matching them
+    are skipped, as early as possible during parsing.
+
+    `store` is an optional `EntryStore`. Entries of a page seen before (with
+    the same URL and content) are loaded from it instead of being parsed.
+
+    `instrument` is an optional `Instrument` to report measurements to.
     """
-    kwargs = {"namespaceHTMLElements": False}
-    if not isinstance(html, six.string_types):
-        html, kwargs["transport_encoding"] = html
-    document = html5lib.parse(html, **kwargs)
-    base_url = _parse_base_url(document, page_url)
-    return list(_iter_entries(document, base_url, package_name))
+    entry_filter = compile_filters(filters)
+    if store is not None:
+        return _get_stored_entries(
+            store, page_url, _get_content_identity(html), package_name,
+            entry_filter, lambda: parse_from_html(
+                html, page_url, package_name,
+                parser=parser, instrument=instrument,
+            ),
+            instrument=instrument,
+        )
+    if instrument is not None:
+        stopwatch = Stopwatch()
+        if entry_filter is not None:
+            entry_filter = CountingFilter(entry_filter)
+    base_url, anchors = _parse_anchors(html, page_url, parser)
+    if instrument is not None:
+        stopwatch.split("tokenize")
+    entries = list(_iter_entries(
+        anchors, base_url, package_name, entry_filter,
+    ))
+    if instrument is not None:
+        stopwatch.split("entries")
+        _report_parse(
+            instrument, page_url, "html", _get_source_size(html),
+            len(anchors), entries, stopwatch, entry_filter,
+        )
+    return entries
+
+
+def _parse_mapped_file(
+        content, page_url, package_name, parser, filters, instrument):
+    if instrument is not None:
+        stopwatch = Stopwatch()
+    anchors = scan_anchor_bytes(content)
+    if anchors is None:     # Needs a real parser. Decode like the scan does.
+        return parse_from_html(
+            decode_html(content[:], None), page_url, package_name,
+            parser=parser, filters=filters, instrument=instrument,
+        )
+    entry_filter = compile_filters(filters)
+    if instrument is not None:
+        stopwatch.split("tokenize")
+        if entry_filter is not None:
+            entry_filter = CountingFilter(entry_filter)
+    entries = list(_iter_entries(
+        anchors, page_url, package_name, entry_filter,
+    ))
+    if instrument is not None:
+        stopwatch.split("entries")
+        _report_parse(
+            instrument, page_url, "html", len(content),
+            len(anchors), entries, stopwatch, entry_filter,
+        )
+    return entries
 
 
-def _entry_from_path(path, package_name):
-    filename = os.path.basename(path)
+def parse_from_file(
+        path, page_url, package_name, parser=None, filters=(), store=None,
+        instrument=None):
+    """Parse entries from an HTML file on the local filesystem.
+
+    The file is memory-mapped, and anchors are picked out of its bytes
+    without decoding or tokenizing the whole document. Files containing
+    anything the scan can't handle (e.g. comments or ``<base>``) are parsed
+    with `parser` instead, like in `parse_from_html`.
+
+    `page_url` is the URL relative links are resolved against, usually the
+    file's ``file:`` URL. Other arguments are used like in `parse_from_html`.
+    """
+    with open(path, "rb") as f:
+        if not os.fstat(f.fileno()).st_size:
+            return []   # Empty files can't be mapped.
+        content = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
     try:
-        version = _parse_version(filename, package_name)
-    except ValueError:
+        if store is None:
+            return _parse_mapped_file(
+                content, page_url, package_name, parser, filters, instrument,
+            )
+        return _get_stored_entries(
+            store, page_url, _get_content_identity((content, None)),
+            package_name, compile_filters(filters),
+            lambda: _parse_mapped_file(
+                content, page_url, package_name, parser, (), instrument,
+            ),
+            instrument=instrument,
+        )
+    finally:
+        content.close()
+
+
+class IncrementalParser(object):
+    """Parse entries from HTML bytes, fed chunk by chunk as they arrive.
+
+    ``feed()`` returns a list of entries from anchors completed by the chunk,
+    and ``close()`` (called after the last chunk) returns the rest. This
+    lets a fetcher parse a page while it is still being downloaded, without
+    keeping the whole page in memory.
+
+    The encoding is detected from the BOM, `transport_encoding`, or a
+    ``<meta>`` declaration, like `parse_from_html` does. The document is
+    always tokenized with the standard library's HTML parser; see
+    `AnchorStream` for how ``<base>`` is handled. `filters` is applied like
+    in `parse_from_html`.
+    """
+    def __init__(
+            self, page_url, package_name, transport_encoding=None,
+            filters=()):
+        self.page_url = page_url
+        self.package_name = package_name
+        self._stream = AnchorStream(transport_encoding)
+        self._entry_filter = compile_filters(filters)
+        self._base_url = None
+
+    def __repr__(self):
+        return "IncrementalParser({0!r}, {1!r})".format(
+            self.page_url, self.package_name,
+        )
+
+    def _build_entries(self, anchors):
+        if not anchors:
+            return []
+        if self._base_url is None:
+            self._base_url = self._stream.base_href or self.page_url
+        return list(_iter_entries(
+            anchors, self._base_url, self.package_name, self._entry_filter,
+        ))
+
+    def feed(self, chunk):
+        return self._build_entries(self._stream.feed(chunk))
+
+    def close(self):
+        return self._build_entries(self._stream.close())
+
+
+def iter_from_chunks(
+        chunks, page_url, package_name, transport_encoding=None,
+        filters=()):
+    """Parse entries from an iterable of HTML byte chunks.
+
+    This is a generator wrapping `IncrementalParser`; entries are yielded
+    as soon as their anchors are complete.
+    """
+    parser = IncrementalParser(
+        page_url, package_name, transport_encoding, filters=filters,
+    )
+    for chunk in chunks:
+        for entry in parser.feed(chunk):
+            yield entry
+    for entry in parser.close():
+        yield entry
+
+
+def _iter_json_entries(files, page_url, package_name, entry_filter=None):
+    resolver = _get_url_resolver(page_url)
+    match_version = get_filename_matcher(package_name).match_version
+    for info in files:
+        filename = info.get("filename")
+        url = info.get("url")
+        if not filename or not url:
+            continue
+        version = match_version(filename)
+        if version is None:
+            continue
+        if entry_filter and not entry_filter.match_version_string(version):
+            continue
+        requires_python = info.get("requires-python") or ""
+        if entry_filter and not entry_filter.match_requires_python_string(
+                requires_python):
+            continue
+        hashes = info.get("hashes") or EMPTY_HASHES
+        gpg_sig = info.get("gpg-sig")
+        if gpg_sig is None:
+            gpg_sig = ""
+        else:
+            gpg_sig = "true" if gpg_sig else "false"
+        entry = LazyEntry(
+            package_name, version, url,
+            hashes, requires_python, gpg_sig,
+            base_url=resolver,
+        )
+        if entry_filter and not entry_filter.match_entry(entry):
+            continue
+        yield entry
+
+
+def parse_from_json(
+        data, page_url, package_name, filters=(), instrument=None):
+    """Parse entries from a PEP 691 JSON project page.
+
+    `data` should be either text, or a 2-tuple of (content, encoding), like
+    the `html` argument to `parse_from_html`. The content is decoded as UTF-8
+    if the encoding is `None`.
+
+    Hashes and requires-python are taken from the JSON fields as given. The
+    boolean ``gpg-sig`` field is converted to ``"true"`` or ``"false"``, the
+    same values the HTML attribute would contain.
+
+    `filters` and `instrument` are used like in `parse_from_html`.
+    """
+    entry_filter = compile_filters(filters)
+    if instrument is not None:
+        stopwatch = Stopwatch()
+        if entry_filter is not None:
+            entry_filter = CountingFilter(entry_filter)
+        size = _get_source_size(data)
+    if not isinstance(data, six.string_types):
+        content, encoding = data
+        data = content.decode(encoding or "utf-8")
+    document = json.loads(data)
+    files = document.get("files", ())
+    if instrument is not None:
+        stopwatch.split("decode")
+    entries = list(_iter_json_entries(
+        files, page_url, package_name, entry_filter,
+    ))
+    if instrument is not None:
+        stopwatch.split("entries")
+        _report_parse(
+            instrument, page_url, "json", size,
+            len(files), entries, stopwatch, entry_filter,
+        )
+    return entries
+
+
+def _entry_from_path(path, version, package_name, entry_filter=None):
+    if version is None:
+        return None
+    if entry_filter and not entry_filter.match_version_string(version):
         return None
-    return Entry(package_name, version, Endpoint(True, path), {}, None, None)
+    entry = LazyEntry(
+        package_name, version, Endpoint(True, path), EMPTY_HASHES, None, None,
+    )
+    if entry_filter and not entry_filter.match_entry(entry):
+        return None
+    return entry
 
 
-def list_from_paths(paths, root, package_name):
+def list_from_paths(
+        paths, root, package_name, filters=(), store=None, instrument=None):
     """Parse entries from a file listing.
 
     `paths` should be a sequence of paths, e.g. from `os.listdir()`. Paths can
     be either absolute or relative to `root`.
+
+    `filters`, `store` and `instrument` are used like in `parse_from_html`.
+    A listing is identified by its paths, in order.
     """
-    return [
+    entry_filter = compile_filters(filters)
+    if store is not None:
+        paths = list(paths)
+        return _get_stored_entries(
+            store, root, _get_content_identity("\0".join(paths)),
+            package_name, entry_filter,
+            lambda: list_from_paths(
+                paths, root, package_name, instrument=instrument,
+            ),
+            instrument=instrument,
+        )
+    if instrument is not None:
+        stopwatch = Stopwatch()
+        if entry_filter is not None:
+            entry_filter = CountingFilter(entry_filter)
+    paths = [os.path.join(root, path) for path in paths]
+    versions = get_filename_matcher(package_name).match_many(
+        os.path.basename(path) for path in paths
+    )
+    entries = [
         entry for entry in (
-            _entry_from_path(os.path.join(root, path), package_name)
-            for path in paths
+            _entry_from_path(path, version, package_name, entry_filter)
+            for path, version in zip(paths, versions)
         )
         if entry is not None
     ]
+    if instrument is not None:
+        stopwatch.split("entries")
+        _report_parse(
+            instrument, root, "paths", len(paths),
+            len(paths), entries, stopwatch, entry_filter,
+        )
+    return entries
@@ -1,17 +1,30 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import collections
+import sys
+
+from timeit import default_timer
+
 import six
 
-from .utils import package_names_match
+from packaging.utils import canonicalize_name
+
+from .filters import compile_filters
+from .transports import Transport
+from .utils import _get_filename, package_names_match
 
 
 class Fetcher(six.Iterator):
     """Base fetch implementation to apply requirement filtering.
+
+    `instrument` is an optional `Instrument` to report the time spent getting
+    entries from each endpoint to.
     """
-    def __init__(self, repository, package_name):
+    def __init__(self, repository, package_name, instrument=None):
         self._repository = repository
         self._package_name = package_name
+        self._instrument = instrument
 
     def __repr__(self):
         return "Fetcher({endpoint!r}, {package_name!r})".format(
@@ -29,8 +42,431 @@ class Fetcher(six.Iterator):
         for endpoint in self._repository.iter_endpoints(self._package_name):
             yield endpoint
 
-    def iter_entries(self, endpoint, source):
+    def iter_entries(self, endpoint, source, content_type=None, filters=()):
+        """Iterate through entries parsed from an endpoint's content.
+
+        `filters` is an optional sequence of `Filter` instances. Filtering
+        here is cheaper than wrapping the fetcher with the filters, since
+        entries are rejected before they are fully built.
+        """
         name = self._package_name
-        for entry in self._repository.get_entries(name, endpoint, source):
+        instrument = self._instrument
+        if instrument is not None:
+            start = default_timer()
+        entries = self._repository.get_entries(
+            name, endpoint, source,
+            content_type=content_type, filters=filters,
+        )
+        if instrument is not None:
+            entries = [e for e in entries if package_names_match(e.name, name)]
+            instrument.on_entries(
+                endpoint.as_url(), default_timer() - start, len(entries),
+            )
+            for entry in entries:
+                yield entry
+            return
+        for entry in entries:
             if package_names_match(entry.name, name):
                 yield entry
+
+
+class BatchFetcher(object):
+    """Fetch entries of many packages from one repository.
+
+    Endpoints shared between packages (e.g. a find-links page) are only
+    listed once by `iter_endpoints`, so the I/O layer can fetch each distinct
+    endpoint exactly once, possibly concurrently. Content from each endpoint
+    is then passed to `get_entries`, which parses it for all packages found
+    on that endpoint at once.
+    """
+    def __init__(self, repository, package_names):
+        self._repository = repository
+        self._package_names = []
+        for name in package_names:
+            name = canonicalize_name(name)
+            if name not in self._package_names:
+                self._package_names.append(name)
+        self._groups = None
+
+    def __repr__(self):
+        return "BatchFetcher({endpoint!r}, {package_names!r})".format(
+            endpoint=self._repository.base_endpoint.value,
+            package_names=self._package_names,
+        )
+
+    def _get_groups(self):
+        if self._groups is None:
+            self._groups = collections.OrderedDict(
+                self._repository.group_endpoints(self._package_names),
+            )
+        return self._groups
+
+    @property
+    def package_names(self):
+        return list(self._package_names)
+
+    def iter_endpoints(self):
+        for endpoint in self._get_groups():
+            yield endpoint
+
+    def get_entries(self, endpoint, source, content_type=None, filters=()):
+        """Get entries of packages on an endpoint from its content.
+
+        Returns a dict mapping canonical package names to lists of entries.
+        Only packages found on this endpoint are included.
+        """
+        names = self._get_groups()[endpoint]
+        return self._repository.get_entries_many(
+            names, endpoint, source,
+            content_type=content_type, filters=filters,
+        )
+
+    def collect(self, sources, content_types=None, filters=()):
+        """Get entries of all packages from fetched contents.
+
+        `sources` is a mapping of each endpoint (from `iter_endpoints`) to its
+        content. `content_types` optionally maps endpoints to Content-Type
+        values. Returns a dict mapping every requested package's canonical
+        name to a list of entries.
+        """
+        result = {name: [] for name in self._package_names}
+        for endpoint in self.iter_endpoints():
+            content_type = (content_types or {}).get(endpoint)
+            entries = self.get_entries(
+                endpoint, sources[endpoint],
+                content_type=content_type, filters=filters,
+            )
+            for name, name_entries in entries.items():
+                result[name].extend(name_entries)
+        return result
+
+
+def _group_pairs(pairs):
+    groups = collections.OrderedDict()
+    for repository, package_name in pairs:
+        groups.setdefault(repository, []).append(package_name)
+    return groups
+
+
+class ThreadPoolFetcher(six.Iterator):
+    """Fetch entries of many (repository, package name) pairs in parallel.
+
+    Each distinct endpoint is fetched once by a `Transport` in a pool of
+    worker threads, and entries are yielded as soon as each response is
+    parsed. The order of entries is therefore not deterministic.
+
+    This only uses the standard library. Call `close` (or use the fetcher
+    as a context manager) to stop the workers if iteration is abandoned.
+    If `transport` is `None`, a `Transport` is created, and closed with the
+    fetcher.
+
+    `instrument` is an optional `Instrument` to report the time spent getting
+    entries from each endpoint to. It is also given to the `Transport`
+    created if `transport` is `None`; pass it to your own transport to
+    measure fetches.
+
+    `flight` is an optional `SingleFlight` shared between fetchers running
+    in different threads. An endpoint requested by multiple fetchers at the
+    same time is then only downloaded once, and parsed once for the same
+    packages and equal filters (see `FilterChain`).
+    """
+    def __init__(
+            self, pairs, transport=None, max_workers=8, filters=(),
+            instrument=None, flight=None):
+        self._batches = [
+            BatchFetcher(repository, names)
+            for repository, names in _group_pairs(pairs).items()
+        ]
+        self._owns_transport = transport is None
+        if transport is None:
+            transport = Transport(instrument=instrument)
+        self._transport = transport
+        self._max_workers = max_workers
+        self._filters = compile_filters(filters)
+        self._instrument = instrument
+        self._flight = flight
+        self._pool = None
+        self._iterator = None
+
+    def __repr__(self):
+        return "ThreadPoolFetcher({0!r})".format(self._batches)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._iterator is None:
+            self._iterator = self._iter_entries()
+        return next(self._iterator)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool = None
+        if self._owns_transport:
+            self._transport.close()
+
+    def _fetch(self, job):
+        batch, endpoint = job
+        flight = self._flight
+        if flight is None:
+            return self._get_entries(batch, endpoint)
+        repository = batch._repository
+        key = (
+            "entries", type(repository), repository.base_endpoint,
+            tuple(batch.package_names), endpoint, self._filters,
+        )
+        return flight.do(key, self._get_entries, batch, endpoint)
+
+    def _download(self, endpoint, accept):
+        if self._flight is None:
+            return self._transport.fetch(endpoint, accept=accept)
+        return self._flight.do(
+            ("fetch", endpoint, accept), self._transport.fetch,
+            endpoint, accept,
+        )
+
+    def _get_entries(self, batch, endpoint):
+        accept = batch._repository.accept_header
+        response = self._download(endpoint, accept)
+        if response.status == 404:  # Package does not exist.
+            return []
+        response.raise_for_status()
+        instrument = self._instrument
+        if instrument is not None:
+            start = default_timer()
+        result = batch.get_entries(
+            endpoint, response.source,
+            content_type=response.content_type, filters=self._filters,
+        )
+        entries = [entry for entries in result.values() for entry in entries]
+        if instrument is not None:
+            instrument.on_entries(
+                endpoint.as_url(), default_timer() - start, len(entries),
+            )
+        return entries
+
+    def _iter_entries(self):
+        jobs = [
+            (batch, endpoint)
+            for batch in self._batches
+            for endpoint in batch.iter_endpoints()
+        ]
+        if not jobs:
+            return
+        from multiprocessing.pool import ThreadPool     # Slow to import.
+        self._pool = ThreadPool(min(self._max_workers, len(jobs)))
+        try:
+            for entries in self._pool.imap_unordered(self._fetch, jobs):
+                for entry in entries:
+                    yield entry
+        finally:
+            self.close()
+
+
+class _Deduplicator(object):
+    """Tell whether an entry is a file already seen.
+
+    Entries are the same file if their filenames are equal, and they have
+    equal digests for the hash names they share. Entries without hashes
+    are only the same as others without hashes.
+    """
+    def __init__(self):
+        self._seen = collections.defaultdict(list)   # {filename: [hashes]}
+
+    def is_duplicate(self, entry):
+        hashes = entry.hashes
+        seen = self._seen[_get_filename(entry.endpoint)]
+        for other in seen:
+            shared = [name for name in hashes if name in other]
+            if shared:
+                if all(hashes[name] == other[name] for name in shared):
+                    return True
+            elif not hashes and not other:
+                return True
+        seen.append(hashes)
+        return False
+
+
+class AggregateFetcher(six.Iterator):
+    """Fetch entries of a package from many repositories at once.
+
+    Endpoints of all `repositories` are fetched concurrently by `transport`
+    in a pool of worker threads, so the time taken is about that of the
+    slowest repository, not the sum of all of them.
+
+    Entries are yielded in priority order. `priorities` is a sequence of
+    numbers, one for each repository (lower is yielded first), and defaults
+    to the order of `repositories`. Entries of a repository are held until
+    all repositories of higher priority are done; between repositories of
+    equal priority, entries are yielded as they arrive.
+
+    A file found on multiple repositories (with the same filename, and equal
+    digests for hash names both entries have) is only yielded once, from the
+    repository yielded first. `transport`, `filters`, `instrument` and
+    `flight` are used like in `ThreadPoolFetcher`.
+    """
+    def __init__(
+            self, repositories, package_name, transport=None, max_workers=8,
+            filters=(), priorities=None, instrument=None, flight=None):
+        self._fetchers = [
+            Fetcher(repository, package_name, instrument=instrument)
+            for repository in repositories
+        ]
+        if priorities is None:
+            priorities = range(len(self._fetchers))
+        self._priorities = list(priorities)
+        if len(self._priorities) != len(self._fetchers):
+            raise ValueError("priorities do not match repositories")
+        self._owns_transport = transport is None
+        if transport is None:
+            transport = Transport(instrument=instrument)
+        self._transport = transport
+        self._max_workers = max_workers
+        self._filters = compile_filters(filters)
+        self._flight = flight
+        self._package_name = package_name
+        self._pool = None
+        self._iterator = None
+
+    def __repr__(self):
+        return "AggregateFetcher({0!r}, {1!r})".format(
+            [fetcher._repository for fetcher in self._fetchers],
+            self._package_name,
+        )
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._iterator is None:
+            self._iterator = self._iter_entries()
+        return next(self._iterator)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool = None
+        if self._owns_transport:
+            self._transport.close()
+
+    def _download(self, endpoint, accept):
+        if self._flight is None:
+            return self._transport.fetch(endpoint, accept=accept)
+        return self._flight.do(
+            ("fetch", endpoint, accept), self._transport.fetch,
+            endpoint, accept,
+        )
+
+    def _fetch(self, job):
+        index, endpoint = job
+        fetcher = self._fetchers[index]
+        response = self._download(
+            endpoint, fetcher._repository.accept_header,
+        )
+        if response.status == 404:  # Package does not exist.
+            return index, []
+        response.raise_for_status()
+        return index, list(fetcher.iter_entries(
+            endpoint, response.source,
+            content_type=response.content_type, filters=self._filters,
+        ))
+
+    def _iter_entries(self):
+        jobs = [
+            (index, endpoint)
+            for index, fetcher in enumerate(self._fetchers)
+            for endpoint in fetcher.iter_endpoints()
+        ]
+        if not jobs:
+            return
+        # Jobs not finished, and entries held, for each priority.
+        pending = collections.Counter(self._priorities[i] for i, _ in jobs)
+        held = collections.defaultdict(list)
+        levels = sorted(pending)
+        deduplicator = _Deduplicator()
+        from multiprocessing.pool import ThreadPool     # Slow to import.
+        self._pool = ThreadPool(min(self._max_workers, len(jobs)))
+        try:
+            results = self._pool.imap_unordered(self._fetch, jobs)
+            for index, entries in results:
+                priority = self._priorities[index]
+                pending[priority] -= 1
+                held[priority].extend(entries)
+                while levels and not pending[levels[0]]:
+                    for entry in held.pop(levels.pop(0), ()):
+                        if not deduplicator.is_duplicate(entry):
+                            yield entry
+                if levels:  # Ones of the current priority can go now.
+                    for entry in held.pop(levels[0], ()):
+                        if not deduplicator.is_duplicate(entry):
+                            yield entry
+        finally:
+            self.close()
+
+
+if sys.version_info >= (3, 6):
+    from ._async import AsyncFetcherMixin, ConcurrencyLimits
+
+    class AsyncFetcher(AsyncFetcherMixin, Fetcher):
+        """Base asynchronous fetcher, with bounded concurrency.
+
+        `transport` is a coroutine function called with an endpoint and a
+        dict of headers to send (including Accept), returning a `Response`.
+        It is only called for remote endpoints; local ones are read in an
+        executor.
+
+        `limits` is a `ConcurrencyLimits` instance, which should be shared
+        between fetchers running in the same event loop to bound the total
+        number of requests. A new one is created if this is `None`.
+
+        `cache` is an optional `ResponseCache` to reuse and revalidate
+        responses with.
+
+        `instrument` is an optional `Instrument` to report fetches, cache
+        lookups and the time spent getting entries to.
+
+        `flight` is an optional `AsyncSingleFlight` shared between fetchers
+        in the same event loop. An endpoint requested by multiple fetchers
+        at the same time is then only downloaded once, and parsed once for
+        the same package and equal filters (see `FilterChain`).
+
+        All endpoints are requested concurrently (within the limits), and
+        entries are yielded as each response arrives. Outstanding requests
+        are cancelled if iteration stops early, either by calling `aclose`,
+        using the fetcher as an async context manager, or when the fetcher
+        is garbage collected.
+        """
+        def __init__(
+                self, repository, package_name, transport,
+                limits=None, filters=(), cache=None, instrument=None,
+                flight=None):
+            super(AsyncFetcher, self).__init__(
+                repository, package_name, instrument=instrument,
+            )
+            if limits is None:
+                limits = ConcurrencyLimits()
+            self._transport = transport
+            self._limits = limits
+            self._filters = compile_filters(filters)
+            self._cache = cache
+            self._flight = flight
+            self._iterator = None
+
+        def __repr__(self):
+            return "AsyncFetcher({endpoint!r}, {package_name!r})".format(
+                endpoint=self._repository.base_endpoint.value,
+                package_name=self._package_name,
+            )
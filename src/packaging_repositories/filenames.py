@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import re
+
+import packaging.version
+
+from packaging.utils import canonicalize_name
+
+from .interning import InternCache
+from .utils import (
+    EGG_INFO_RE, WHEEL_EXTENSION, WHEEL_FILENAME_RE, split_entry_ext,
+)
+
+
+try:
+    packaging.version.LegacyVersion
+except AttributeError:  # packaging>=22 rejects versions not in PEP 440.
+    _VALID_VERSION_RE = re.compile(
+        r"^\s*" + packaging.version.VERSION_PATTERN + r"\s*$",
+        re.VERBOSE | re.IGNORECASE,
+    )
+else:   # Everything can be parsed, falling back to LegacyVersion.
+    _VALID_VERSION_RE = None
+
+
+def _check_version(value):
+    return _VALID_VERSION_RE is None or bool(_VALID_VERSION_RE.match(value))
+
+
+def _classify(filename):
+    # The package-independent part of matching a filename. For a wheel, this
+    # is (True, canonical name, version); for anything else, (False, lowered
+    # egg-info name with underscores as dashes, egg-info name). `None` if the
+    # filename can't belong to any package.
+    stem, ext = split_entry_ext(filename)
+    if ext == WHEEL_EXTENSION:
+        match = WHEEL_FILENAME_RE.match(filename)
+        if not match:
+            return None
+        name, version = match.group("name", "ver")
+        return (True, canonicalize_name(name), version)
+    match = EGG_INFO_RE.search(stem)
+    if not match:
+        return None
+    egg_info = match.group(0)
+    return (False, egg_info.lower().replace("_", "-"), egg_info)
+
+
+# Filenames repeat a lot, across pages of mirrors and lookups of the same
+# project, so the work that does not depend on the package is cached.
+classify_filename = InternCache(_classify, maxsize=65536)
+
+is_valid_version = InternCache(_check_version, maxsize=8192)
+
+
+class FilenameMatcher(object):
+    """Match filenames against a package, and get versions out of them.
+
+    The package name is normalized once when the matcher is created, instead
+    of for each filename. Results are the same as `match_egg_info_version`
+    (for sdists) or the wheel filename regex (for wheels) would give.
+    """
+    def __init__(self, package_name):
+        self.package_name = package_name
+        self._canonical_name = canonicalize_name(package_name)
+        # See match_egg_info_version; this is not canonicalization.
+        self._egg_info_prefix = package_name.lower() + "-"
+
+    def __repr__(self):
+        return "FilenameMatcher({0!r})".format(self.package_name)
+
+    def match_version(self, filename):
+        """Get the version string from a filename of this package.
+
+        Returns `None` if the filename does not belong to the package, or
+        does not contain a valid version. The version is not parsed.
+        """
+        info = classify_filename(filename)
+        if info is None:
+            return None
+        is_wheel, key, value = info
+        if is_wheel:
+            if key != self._canonical_name:
+                return None
+            version = value
+        else:
+            if not key.startswith(self._egg_info_prefix):
+                return None
+            version = value[len(self._egg_info_prefix):]
+        if not is_valid_version(version):
+            return None
+        return version
+
+    def match_many(self, filenames):
+        """Match a listing of filenames in one pass.
+
+        Returns a list of version strings (or `None` for filenames that do
+        not belong to the package), in the order of `filenames`.
+        """
+        match_version = self.match_version
+        return [match_version(filename) for filename in filenames]
+
+
+get_filename_matcher = InternCache(FilenameMatcher, maxsize=256)
@@ -1,26 +1,26 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import abc
 import sys
 
-import packaging.specifiers
 import packaging.version
 import six
 
+from .interning import (
+    InternCache, intern_specifier, intern_version, parse_specifier,
+)
+from .utils import WHEEL_EXTENSION, WHEEL_FILENAME_RE, _get_filename
 
-ASYNC_ITERATOR_CODE = """
-def __aiter__(self):
-    return self
 
-async def __anext__(self):
-    while True:
-        value = await self.iterator.__anext__()
-        if self.func(value):
-            return value
-"""
+if sys.version_info >= (3, 6):
+    from ._async import AsyncFilterMixin as _AsyncFilterMixin
+else:
+    class _AsyncFilterMixin(object):
+        pass
 
 
-class _Filter(six.Iterator):
+class _Filter(_AsyncFilterMixin, six.Iterator):
     """Implement both sync and async iterator protocols.
 
     This is used internally as the return value of ``Filter.__call__()``.
@@ -41,8 +41,18 @@ class _Filter(six.Iterator):
             if self.func(value):
                 return value
 
-    if sys.version_info >= (3, 6):
-        six.exec_(ASYNC_ITERATOR_CODE)
+
+def _count_matches(func, instrument):
+    def match(entry):
+        matched = func(entry)
+        instrument.on_filter("wrapped", 1, 0 if matched else 1)
+        return matched
+    return match
+
+
+def _overrides(instance, name):
+    method = six.get_unbound_function(getattr(type(instance), name))
+    return method is not six.get_unbound_function(getattr(Filter, name))
 
 
 class Filter(object):
@@ -50,39 +60,324 @@ class Filter(object):
 
     This class does not do anything. Subclasses are expected to override
     ``match`` to perform the actual filtering logic.
+
+    Subclasses that only look at the version or requires-python of an entry
+    should instead override ``match_version`` or ``match_requires_python``.
+    These are called by the parser before an entry is even built (when the
+    filter is passed into ``Fetcher.iter_entries()``), so entries can be
+    rejected as cheaply as possible.
+
+    Calling the filter wraps an (async) iterator of entries. Pass an
+    `Instrument` as `instrument` to report each entry checked to it, under
+    the ``"wrapped"`` stage. Filters pushed down into the parser report to
+    the instrument given to the parser instead.
     """
-    def __call__(self, entry_iterator):
-        return _Filter(self.match, entry_iterator)
+    def __call__(self, entry_iterator, instrument=None):
+        match = self.match
+        if instrument is not None:
+            match = _count_matches(match, instrument)
+        return _Filter(match, entry_iterator)
+
+    def __and__(self, other):
+        if not isinstance(other, Filter):
+            return NotImplemented
+        return FilterChain([self, other])
 
     def match(self, entry):
+        if not self.match_version(entry.version):
+            return False
+        return self.match_requires_python(entry.requires_python)
+
+    def match_version(self, version):
+        return True
+
+    def match_requires_python(self, requires_python):
         return True
 
 
-class RequiresPythonFilter(Filter):
+@six.add_metaclass(abc.ABCMeta)
+class _ValueFilter(Filter):
+    """Base class for filters comparing by value.
+
+    A filter is equal to another of the same type with an equal key, so
+    equal filters share work keyed on them (e.g. coalesced parses). Other
+    filters are only equal to themselves.
+
+    Subclasses must define `_get_key`, returning a hashable value that
+    determines what the filter matches.
+    """
+    @abc.abstractmethod
+    def _get_key(self):
+        pass
+
+    def __eq__(self, other):
+        if type(self) is not type(other):
+            return NotImplemented
+        return self._get_key() == other._get_key()
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+        return not result
+
+    def __hash__(self):
+        return hash(self._get_key())
+
+
+class FilterChain(_ValueFilter):
+    """Several filters compiled into one predicate.
+
+    Calling the chain on an iterator checks each entry against all filters
+    in one pass, instead of nesting an iterator per filter. Chains are also
+    used to push filters down into the parser: checks on version and
+    requires-python strings are memoized per unique string, so they are
+    made at most once per page for each value.
+
+    Chains are equal if their filters are. `VersionFilter` and
+    `RequiresPythonFilter` compare by value; other filters by identity.
+    """
+    def __init__(self, filters):
+        self.filters = []
+        for f in filters:
+            if isinstance(f, FilterChain):
+                self.filters.extend(f.filters)
+            else:
+                self.filters.append(f)
+        self._version_checks = [
+            f.match_version for f in self.filters
+            if _overrides(f, "match_version")
+        ]
+        self._requires_python_checks = [
+            f.match_requires_python for f in self.filters
+            if _overrides(f, "match_requires_python")
+        ]
+        self._entry_checks = [
+            f.match for f in self.filters
+            if _overrides(f, "match")
+        ]
+        self._version_strings = InternCache(self._check_version, 1024)
+        self._requires_python_strings = InternCache(
+            self._check_requires_python, 256,
+        )
+
+    def __repr__(self):
+        return "FilterChain({0!r})".format(self.filters)
+
+    def _get_key(self):
+        return tuple(self.filters)
+
+    def _check_version(self, value):
+        return self.match_version(intern_version(value))
+
+    def _check_requires_python(self, value):
+        return self.match_requires_python(intern_specifier(value))
+
+    def match(self, entry):
+        if not self.match_version(entry.version):
+            return False
+        if not self.match_requires_python(entry.requires_python):
+            return False
+        return self.match_entry(entry)
+
+    def match_version(self, version):
+        return all(check(version) for check in self._version_checks)
+
+    def match_requires_python(self, requires_python):
+        return all(
+            check(requires_python)
+            for check in self._requires_python_checks
+        )
+
+    def match_entry(self, entry):
+        """Run filters that need to look at the whole entry.
+
+        This skips checks already done by ``match_version_string`` and
+        ``match_requires_python_string``.
+        """
+        return all(check(entry) for check in self._entry_checks)
+
+    def match_version_string(self, value):
+        if not self._version_checks:
+            return True
+        return self._version_strings(value)
+
+    def match_requires_python_string(self, value):
+        if not self._requires_python_checks or value is None:
+            return True
+        return self._requires_python_strings(value)
+
+
+def compile_filters(filters):
+    """Combine a sequence of filters into a `FilterChain`.
+
+    Returns `None` if there is nothing to filter.
+    """
+    if not filters:
+        return None
+    if isinstance(filters, FilterChain):
+        return filters
+    if isinstance(filters, Filter):
+        filters = [filters]
+    return FilterChain(filters)
+
+
+class RequiresPythonFilter(_ValueFilter):
     """Filter on the requires-python specifier matching the given version.
+
+    Results are cached per unique specifier, since the same requires-python
+    value is usually shared by most entries of a project.
     """
     def __init__(self, version):
         if isinstance(version, six.string_types):
             version = packaging.version.parse(version)
         self.version = version
+        self._contains = InternCache(self._check, maxsize=256)
 
     def __repr__(self):
         return "RequiresPythonFilter({0!r})".format(str(self.version))
 
-    def match(self, entry):
-        return entry.requires_python.contains(self.version)
+    def _get_key(self):
+        return self.version
+
+    def _check(self, specifier):
+        return specifier.contains(self.version)
 
+    def match_requires_python(self, requires_python):
+        if requires_python is None:     # Not specified, e.g. local file.
+            return True
+        return self._contains(requires_python)
 
-class VersionFilter(Filter):
+
+class VersionFilter(_ValueFilter):
     """Filter on the version contained in a given range.
     """
     def __init__(self, specifier):
         if isinstance(specifier, six.string_types):
-            specifier = packaging.specifiers.SpecifierSet(specifier)
+            specifier = parse_specifier(specifier)
         self.specifier = specifier
 
     def __repr__(self):
         return "VersionFilter({0!r})".format(str(self.specifier))
 
+    def _get_key(self):
+        return self.specifier
+
+    def match_version(self, version):
+        return self.specifier.contains(version)
+
+
+def _parse_wheel_tags(filename):
+    # Expand the compressed tag sets in a wheel filename, e.g. "py2.py3"
+    # into two tags. `None` if this is not a valid wheel filename.
+    import packaging.tags
+    match = WHEEL_FILENAME_RE.match(filename)
+    if not match:
+        return None
+    return packaging.tags.parse_tag("-".join(
+        match.group("pyver", "abi", "plat"),
+    ))
+
+
+# Filenames repeat across filters and lookups, so tags are parsed once.
+parse_wheel_tags = InternCache(_parse_wheel_tags, maxsize=65536)
+
+
+def get_target_tags(
+        python_version=None, implementation=None, abis=None, platforms=None):
+    """Get tags supported by a target environment, most preferred first.
+
+    This is for targets other than the running interpreter, e.g. to lock
+    dependencies for another platform. Arguments not given are taken from
+    the running interpreter. `python_version` is a tuple such as ``(3, 8)``,
+    `implementation` an interpreter abbreviation such as ``"cp"`` or
+    ``"pp"``, and `abis` and `platforms` lists of tag components, such as
+    ``["cp38"]`` and ``["manylinux2014_x86_64"]``.
+
+    ABIs of CPython are derived from `python_version`. Other interpreters
+    only get the ``"none"`` ABI, unless the target is the running
+    interpreter, or `abis` is given.
+    """
+    import packaging.tags
+    host_version = sys.version_info[:2]
+    host_implementation = packaging.tags.interpreter_name()
+    if python_version is None:
+        python_version = host_version
+    if implementation is None:
+        implementation = host_implementation
+    target = (implementation, tuple(python_version[:2]))
+    is_host = target == (host_implementation, host_version)
+    if abis is None and implementation != "cp" and not is_host:
+        abis = ["none"]     # The ABI of another interpreter can't be known.
+    interpreter = "{0}{1}".format(
+        implementation, "".join(str(v) for v in python_version[:2]),
+    )
+    if implementation == "cp":
+        tags = list(packaging.tags.cpython_tags(
+            python_version, abis=abis, platforms=platforms,
+        ))
+    else:
+        tags = list(packaging.tags.generic_tags(
+            interpreter, abis=abis, platforms=platforms,
+        ))
+    tags.extend(packaging.tags.compatible_tags(
+        python_version, interpreter=interpreter, platforms=platforms,
+    ))
+    return tags
+
+
+class WheelTagFilter(Filter):
+    """Filter out wheels not compatible with a target environment.
+
+    `tags` is a sequence of `packaging.tags.Tag` instances (or strings like
+    ``"cp38-cp38-manylinux1_x86_64"``), most preferred first. It defaults to
+    tags supported by the running interpreter. Use `get_target_tags` to
+    build tags for another environment. Entries that are not wheels (e.g.
+    sdists) are not filtered.
+
+    Supported tags are indexed by rank once, so checking a wheel costs a
+    lookup per tag in its filename, instead of a scan through all supported
+    tags. Ranks of filenames are cached.
+    """
+    def __init__(self, tags=None):
+        import packaging.tags
+        if tags is None:
+            tags = packaging.tags.sys_tags()
+        self._ranks = {}
+        for rank, tag in enumerate(tags):
+            if isinstance(tag, six.string_types):
+                parsed = packaging.tags.parse_tag(tag)
+            else:
+                parsed = [tag]
+            for tag in parsed:
+                self._ranks.setdefault(tag, rank)
+        self._filename_ranks = InternCache(self._rank_filename, 8192)
+
+    def __repr__(self):
+        return "WheelTagFilter(<{0} tags>)".format(len(self._ranks))
+
+    def _rank_filename(self, filename):
+        tags = parse_wheel_tags(filename)
+        if tags is None:
+            return None
+        ranks = [self._ranks[t] for t in tags if t in self._ranks]
+        if not ranks:
+            return None
+        return min(ranks)
+
+    def get_rank(self, entry):
+        """Get the rank of the best supported tag of a wheel entry.
+
+        Lower ranks are more preferred; 0 is the first of the target's tags.
+        Returns `None` if the entry is not a wheel, or not supported.
+        """
+        filename = _get_filename(entry.endpoint)
+        if not filename.endswith(WHEEL_EXTENSION):
+            return None
+        return self._filename_ranks(filename)
+
     def match(self, entry):
-        return self.specifier.contains(entry.version)
+        filename = _get_filename(entry.endpoint)
+        if not filename.endswith(WHEEL_EXTENSION):
+            return True
+        return self._filename_ranks(filename) is not None
@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import collections
+import os
+import threading
+
+from packaging.utils import canonicalize_name
+
+from .entries import _iter_entries, _parse_anchors
+from .filenames import classify_filename
+from .filters import compile_filters
+from .parsers import Anchor
+
+
+def iter_project_names(filename):
+    """Iterate through canonical names of projects a file may belong to.
+
+    A wheel has exactly one candidate. An sdist name such as ``foo-bar-1.0``
+    is ambiguous (``foo`` version ``bar-1.0``, or ``foo-bar`` version
+    ``1.0``), so every possibility is generated. The result is a superset;
+    the file still needs to be matched against the actual package name.
+    """
+    info = classify_filename(filename)
+    if info is None:
+        return
+    is_wheel, key, value = info
+    if is_wheel:
+        yield key
+        return
+    seen = set()
+    for i, c in enumerate(value):
+        if c not in "-_" or i == 0:
+            continue
+        name = canonicalize_name(value[:i])
+        if name not in seen:
+            seen.add(name)
+            yield name
+
+
+def group_by_project(paths):
+    """Group paths by names of projects they may belong to.
+
+    Returns a mapping of canonical project names to lists of paths. See
+    `iter_project_names` for how a path is matched to names.
+    """
+    groups = collections.defaultdict(list)
+    for path in paths:
+        for name in iter_project_names(os.path.basename(path)):
+            groups[name].append(path)
+    return groups
+
+
+def _iter_filenames(root):
+    try:
+        scandir = os.scandir
+    except AttributeError:  # Python < 3.5.
+        return iter(os.listdir(root))
+    return (entry.name for entry in scandir(root))
+
+
+def _get_mtime(path):
+    stat = os.stat(path)
+    return getattr(stat, "st_mtime_ns", stat.st_mtime)
+
+
+class DirectoryIndex(object):
+    """Map project names to files in a directory.
+
+    The directory is scanned once, and rescanned when its modification time
+    changes (i.e. files are added or removed), or `refresh` is called.
+    """
+    def __init__(self, root):
+        self.root = root
+        self._mtime = None
+        self._filenames = None
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return "DirectoryIndex({0!r})".format(self.root)
+
+    def refresh(self):
+        with self._lock:
+            self._filenames = None
+
+    def get(self, package_name):
+        """Get filenames in the directory that may belong to the package.
+        """
+        mtime = _get_mtime(self.root)
+        with self._lock:
+            if self._filenames is None or mtime != self._mtime:
+                self._filenames = group_by_project(_iter_filenames(self.root))
+                self._mtime = mtime
+            filenames = self._filenames
+        return filenames.get(canonicalize_name(package_name), [])
+
+
+class PageIndex(object):
+    """Anchors on an HTML page, grouped by project names.
+
+    This is used for a find-links page listing files of many projects. The
+    page is parsed once, and each lookup only needs to look at anchors that
+    may belong to the requested project.
+    """
+    def __init__(self, base_url, anchors):
+        self.base_url = base_url
+        self._anchors = collections.defaultdict(list)
+        self._count = 0
+        for anchor in anchors:
+            if not anchor.get("href") or not anchor.text:
+                continue
+            self._count += 1
+            if not isinstance(anchor, Anchor):  # Don't hold the whole DOM.
+                anchor = Anchor(dict(anchor.items()), anchor.text)
+            for name in iter_project_names(anchor.text):
+                self._anchors[name].append(anchor)
+
+    def __repr__(self):
+        return "PageIndex({0!r})".format(self.base_url)
+
+    def __len__(self):
+        """Number of anchors indexed.
+        """
+        return self._count
+
+    @classmethod
+    def from_html(cls, html, page_url, parser=None):
+        """Build an index from HTML source.
+
+        Arguments are interpreted like in `parse_from_html`.
+        """
+        return cls(*_parse_anchors(html, page_url, parser))
+
+    def get_entries(self, package_name, filters=()):
+        anchors = self._anchors.get(canonicalize_name(package_name), ())
+        return list(_iter_entries(
+            anchors, self.base_url, package_name, compile_filters(filters),
+        ))
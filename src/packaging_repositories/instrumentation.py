@@ -0,0 +1,247 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Optional hooks to measure where time goes while finding entries.
+
+Functions and classes that accept an `instrument` argument report to it as
+they work. Nothing is measured (and no timer is read) when the argument is
+`None`, which is the default.
+"""
+
+import collections
+import threading
+
+from timeit import default_timer
+
+from .interning import intern_cache_info
+
+
+class Instrument(object):
+    """Receive measurements from the library.
+
+    All methods do nothing. Subclass this and override methods of interest;
+    `Metrics` is a ready-made implementation that keeps totals in memory.
+    Methods may be called from multiple threads at once.
+
+    `location` arguments are URLs of pages (or paths of directories), so
+    measurements from different stages of the same endpoint can be matched.
+    """
+    def on_fetch(self, location, seconds, size, status):
+        """A response was fetched over the network.
+
+        `size` is the length of the (decompressed) content in bytes.
+        """
+
+    def on_parse(self, location, kind, size, candidates, entries, timings):
+        """Content was parsed into entries.
+
+        `kind` is ``"html"``, ``"json"``, ``"flat"`` (a find-links page being
+        indexed) or ``"paths"``. `size` is the length of the content in bytes
+        or characters (the number of paths for a listing). `candidates` is
+        the number of anchors or files looked at, and `entries` the number
+        of entries produced after filtering. `timings` maps sub-stages, e.g.
+        ``"tokenize"`` and ``"entries"``, to seconds spent.
+        """
+
+    def on_entries(self, location, seconds, count):
+        """A fetcher finished yielding entries from an endpoint.
+
+        `seconds` is the time spent getting entries from the repository,
+        including parsing, excluding time spent by the consumer.
+        """
+
+    def on_filter(self, stage, checked, rejected):
+        """Report how a filter chain worked during one parse.
+
+        `stage` is ``"version"``, ``"requires_python"`` or ``"entry"``. It
+        is ``"wrapped"`` for a filter called on an iterator of entries, which
+        reports each entry as it is checked.
+        """
+
+    def on_cache(self, name, hit):
+        """A cache was looked up.
+
+        `name` is ``"responses"`` (`ResponseCache`, where a revalidated
+        response counts as a hit) or ``"entries"`` (`EntryStore`).
+        """
+
+
+class EndpointMetrics(object):
+    """Totals recorded by `Metrics` for one location.
+    """
+    __slots__ = (
+        "requests", "fetch_seconds", "bytes", "parses", "parse_seconds",
+        "candidates", "entries", "yielded", "yield_seconds",
+    )
+
+    def __init__(self):
+        self.requests = 0
+        self.fetch_seconds = 0.0
+        self.bytes = 0
+        self.parses = 0
+        self.parse_seconds = collections.defaultdict(float)
+        self.candidates = 0
+        self.entries = 0
+        self.yielded = 0
+        self.yield_seconds = 0.0
+
+    def __repr__(self):
+        return "EndpointMetrics({0})".format(", ".join(
+            "{0}={1!r}".format(name, value)
+            for name, value in self.as_dict().items()
+        ))
+
+    def as_dict(self):
+        result = collections.OrderedDict(
+            (name, getattr(self, name)) for name in self.__slots__
+        )
+        result["parse_seconds"] = dict(self.parse_seconds)
+        return result
+
+
+class Metrics(Instrument):
+    """An instrument keeping totals in memory.
+
+    Measurements are aggregated per location in `endpoints`, filter counts
+    per stage in `filters` (as ``[checked, rejected]``), and cache lookups
+    per cache in `caches` (as ``[hits, misses]``). Use `as_dict` to get a
+    snapshot, e.g. to log or dump as JSON.
+    """
+    def __init__(self):
+        self.endpoints = collections.defaultdict(EndpointMetrics)
+        self.filters = collections.defaultdict(lambda: [0, 0])
+        self.caches = collections.defaultdict(lambda: [0, 0])
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return "Metrics(<{0} endpoints>)".format(len(self.endpoints))
+
+    def on_fetch(self, location, seconds, size, status):
+        with self._lock:
+            metrics = self.endpoints[location]
+            metrics.requests += 1
+            metrics.fetch_seconds += seconds
+            metrics.bytes += size
+
+    def on_parse(self, location, kind, size, candidates, entries, timings):
+        with self._lock:
+            metrics = self.endpoints[location]
+            metrics.parses += 1
+            metrics.candidates += candidates
+            metrics.entries += entries
+            for stage, seconds in timings.items():
+                metrics.parse_seconds[stage] += seconds
+
+    def on_entries(self, location, seconds, count):
+        with self._lock:
+            metrics = self.endpoints[location]
+            metrics.yielded += count
+            metrics.yield_seconds += seconds
+
+    def on_filter(self, stage, checked, rejected):
+        with self._lock:
+            counts = self.filters[stage]
+            counts[0] += checked
+            counts[1] += rejected
+
+    def on_cache(self, name, hit):
+        with self._lock:
+            self.caches[name][0 if hit else 1] += 1
+
+    def get_hit_rate(self, name):
+        """Get the ratio of hits in lookups of a cache, or `None`.
+        """
+        with self._lock:
+            hits, misses = self.caches.get(name, (0, 0))
+        if not hits + misses:
+            return None
+        return hits / float(hits + misses)
+
+    def as_dict(self):
+        """Get a snapshot of everything measured.
+
+        Statistics of the process-wide intern caches (see
+        `intern_cache_info`) are included as well.
+        """
+        with self._lock:
+            return {
+                "endpoints": {
+                    location: metrics.as_dict()
+                    for location, metrics in self.endpoints.items()
+                },
+                "filters": {
+                    stage: {"checked": counts[0], "rejected": counts[1]}
+                    for stage, counts in self.filters.items()
+                },
+                "caches": {
+                    name: {"hits": counts[0], "misses": counts[1]}
+                    for name, counts in self.caches.items()
+                },
+                "intern_caches": {
+                    name: info._asdict()
+                    for name, info in intern_cache_info().items()
+                },
+            }
+
+
+class CountingFilter(object):
+    """Wrap a `FilterChain` to count checks made by the parser.
+
+    This quacks like the chain as far as the parsers are concerned. Call
+    `report` when parsing is done to send the counts to an instrument.
+    """
+    def __init__(self, chain):
+        self._chain = chain
+        self._counts = {
+            "version": [0, 0], "requires_python": [0, 0], "entry": [0, 0],
+        }
+
+    def __repr__(self):
+        return "CountingFilter({0!r})".format(self._chain)
+
+    def _count(self, stage, matched):
+        counts = self._counts[stage]
+        counts[0] += 1
+        if not matched:
+            counts[1] += 1
+        return matched
+
+    def match_version_string(self, value):
+        return self._count(
+            "version", self._chain.match_version_string(value),
+        )
+
+    def match_requires_python_string(self, value):
+        return self._count(
+            "requires_python",
+            self._chain.match_requires_python_string(value),
+        )
+
+    def match_entry(self, entry):
+        return self._count("entry", self._chain.match_entry(entry))
+
+    def report(self, instrument):
+        for stage, (checked, rejected) in self._counts.items():
+            if checked:
+                instrument.on_filter(stage, checked, rejected)
+
+
+class Stopwatch(object):
+    """Measure consecutive stages of work.
+
+    Each call to `split` records the time since the previous split (or since
+    the stopwatch was created) under a stage name.
+    """
+    __slots__ = ("timings", "_last")
+
+    def __init__(self):
+        self.timings = {}
+        self._last = default_timer()
+
+    def split(self, stage):
+        now = default_timer()
+        self.timings[stage] = self.timings.get(stage, 0.0) + now - self._last
+        self._last = now
+
+    def total(self):
+        return sum(self.timings.values())
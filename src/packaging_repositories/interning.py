@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import collections
+import threading
+
+import packaging.version
+import six
+
+
+CacheInfo = collections.namedtuple("CacheInfo", [
+    "hits", "misses", "maxsize", "currsize",
+])
+
+
+class InternCache(object):
+    """A bounded, thread-safe LRU mapping keys to objects built from them.
+
+    Calling the cache with a key returns the object previously built for an
+    equal key, or builds one with `factory` (and remembers it). Exceptions
+    raised by `factory` are propagated, and nothing is remembered.
+
+    This is similar to `functools.lru_cache`, which is not available on
+    Python 2.
+    """
+    def __init__(self, factory, maxsize):
+        self._factory = factory
+        self._maxsize = maxsize
+        self._values = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def __repr__(self):
+        return "InternCache({0!r}, maxsize={1!r})".format(
+            self._factory, self._maxsize,
+        )
+
+    def __call__(self, key):
+        with self._lock:
+            try:
+                value = self._values[key]
+            except KeyError:
+                self._misses += 1
+            else:
+                self._mark_used(key, value)
+                self._hits += 1
+                return value
+        value = self._factory(key)
+        with self._lock:
+            self._values[key] = value
+            while len(self._values) > self._maxsize:
+                self._values.popitem(last=False)
+        return value
+
+    if hasattr(collections.OrderedDict, "move_to_end"):
+        def _mark_used(self, key, value):
+            self._values.move_to_end(key)
+    else:   # Python 2.
+        def _mark_used(self, key, value):
+            del self._values[key]
+            self._values[key] = value
+
+    def cache_info(self):
+        with self._lock:
+            return CacheInfo(
+                self._hits, self._misses, self._maxsize, len(self._values),
+            )
+
+    def cache_clear(self):
+        with self._lock:
+            self._values.clear()
+            self._hits = self._misses = 0
+
+
+# Versions repeat across all the files in a release, and requires-python
+# strings across most files of a project. The objects are shared between
+# entries, and should be treated as immutable.
+intern_version = InternCache(packaging.version.parse, maxsize=8192)
+
+
+def parse_specifier(value):
+    """Parse a specifier set, importing ``packaging.specifiers`` on demand.
+
+    The module is slow to import, and not needed e.g. to list a directory.
+    """
+    import packaging.specifiers
+    return packaging.specifiers.SpecifierSet(value)
+
+
+intern_specifier = InternCache(parse_specifier, maxsize=1024)
+
+_empty_specifier = None
+
+
+def get_empty_specifier():
+    """Get the specifier set shared by entries without requires-python.
+
+    Most entries do not specify requires-python. They share this instance,
+    which (unlike objects in `intern_specifier`) is never evicted.
+    """
+    global _empty_specifier
+    if _empty_specifier is None:
+        _empty_specifier = parse_specifier("")
+    return _empty_specifier
+
+
+def intern_string(value):
+    """Intern a native string, so equal values share one object.
+
+    Other values (e.g. unicode on Python 2, or `None`) are returned as-is.
+    """
+    if type(value) is str:
+        return six.moves.intern(value)
+    return value
+
+
+def intern_cache_info():
+    """Get hit/miss statistics of the process-wide intern caches.
+
+    Returns a dict mapping cache names (``"versions"`` and ``"specifiers"``)
+    to `CacheInfo` tuples.
+    """
+    return {
+        "versions": intern_version.cache_info(),
+        "specifiers": intern_specifier.cache_info(),
+    }
@@ -0,0 +1,468 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import codecs
+import re
+
+import six
+
+
+if six.PY3:
+    from html import unescape as _unescape_html
+else:
+    _unescape_html = six.moves.html_parser.HTMLParser().unescape
+
+
+# Encoding labels browsers (and html5lib) treat as aliases to windows-1252.
+_WINDOWS_1252_ALIASES = {
+    "ascii", "us-ascii", "iso-8859-1", "iso8859-1", "latin1", "latin-1", "l1",
+}
+
+_BOMS = [
+    (codecs.BOM_UTF8, "utf-8"),
+    (codecs.BOM_UTF16_LE, "utf-16-le"),
+    (codecs.BOM_UTF16_BE, "utf-16-be"),
+]
+
+_META_CHARSET_RE = re.compile(
+    br"""<meta[^>]+charset\s*=\s*["']?\s*([a-zA-Z0-9_:.+-]+)""",
+    re.IGNORECASE,
+)
+
+# Number of bytes html5lib inspects when looking for a <meta> charset.
+_META_PRESCAN_SIZE = 1024
+
+
+def _lookup_encoding(label):
+    if not label:
+        return None
+    if not isinstance(label, six.text_type):
+        label = label.decode("ascii", "replace")
+    label = label.strip().lower()
+    if label in _WINDOWS_1252_ALIASES:
+        return "cp1252"
+    try:
+        return codecs.lookup(label).name
+    except LookupError:
+        return None
+
+
+def _detect_bom(content):
+    for bom, encoding in _BOMS:
+        if content.startswith(bom):
+            return encoding, len(bom)
+    return None, 0
+
+
+def _detect_meta_encoding(content):
+    match = _META_CHARSET_RE.search(content[:_META_PRESCAN_SIZE])
+    if not match:
+        return None
+    encoding = _lookup_encoding(match.group(1))
+    # A <meta> can't declare UTF-16, because it wouldn't be readable as ASCII.
+    if encoding is not None and encoding.startswith("utf-16"):
+        return "utf-8"
+    return encoding
+
+
+def decode_html(content, transport_encoding):
+    """Decode HTML bytes the way html5lib would, without html5lib.
+
+    The precedence is BOM, transport encoding, then ``<meta>`` declaration.
+    html5lib consults chardet (if installed) and then defaults to
+    windows-1252 when nothing is declared; we try UTF-8 before windows-1252
+    instead, since that is what indexes serve in practice.
+    """
+    encoding, offset = _detect_bom(content)
+    if encoding is None:
+        encoding = _lookup_encoding(transport_encoding)
+    if encoding is None:
+        encoding = _detect_meta_encoding(content)
+    if encoding is not None:
+        return content[offset:].decode(encoding, "replace")
+    try:
+        return content.decode("utf-8")
+    except UnicodeDecodeError:
+        return content.decode("cp1252", "replace")
+
+
+def _sniff_encoding(content, transport_encoding):
+    """Choose an encoding from the beginning of a document.
+
+    Returns a 2-tuple (encoding, BOM length). This follows `decode_html`,
+    except that without any declaration, only `content` (not the whole
+    document) is checked to be valid UTF-8.
+    """
+    encoding, offset = _detect_bom(content)
+    if encoding is None:
+        encoding = _lookup_encoding(transport_encoding)
+    if encoding is None:
+        encoding = _detect_meta_encoding(content)
+    if encoding is None:
+        try:
+            codecs.getincrementaldecoder("utf-8")().decode(content)
+        except UnicodeDecodeError:
+            encoding = "cp1252"
+        else:
+            encoding = "utf-8"
+    return encoding, offset
+
+
+class HTMLDecoder(object):
+    """Decode HTML bytes chunk by chunk.
+
+    The encoding is chosen like `decode_html` does. Bytes are buffered until
+    there is enough to decide, i.e. the BOM can be checked if the transport
+    encoding is known, or the ``<meta>`` declaration can be looked for
+    otherwise.
+    """
+    def __init__(self, transport_encoding=None):
+        self.transport_encoding = transport_encoding
+        self.encoding = None
+        self._decoder = None
+        self._buffer = b""
+
+    def __repr__(self):
+        return "HTMLDecoder({0!r})".format(self.transport_encoding)
+
+    def _is_ready(self):
+        if len(self._buffer) >= _META_PRESCAN_SIZE:
+            return True
+        if len(self._buffer) < len(codecs.BOM_UTF8):
+            return False
+        return _lookup_encoding(self.transport_encoding) is not None
+
+    def decode(self, chunk, final=False):
+        if self._decoder is None:
+            self._buffer += chunk
+            if not final and not self._is_ready():
+                return u""
+            self.encoding, offset = _sniff_encoding(
+                self._buffer, self.transport_encoding,
+            )
+            decoder_cls = codecs.getincrementaldecoder(self.encoding)
+            self._decoder = decoder_cls("replace")
+            chunk = self._buffer[offset:]
+            self._buffer = b""
+        return self._decoder.decode(chunk, final)
+
+
+class Anchor(object):
+    """An anchor tag picked out of an HTML document.
+
+    This quacks like an ElementTree element produced by html5lib, but only
+    the bits needed to build entries (``get()`` and ``text``).
+    """
+    __slots__ = ("attrs", "text")
+
+    def __init__(self, attrs, text=None):
+        self.attrs = attrs
+        self.text = text
+
+    def __repr__(self):
+        return "Anchor({0!r}, {1!r})".format(self.attrs, self.text)
+
+    def get(self, key, default=None):
+        return self.attrs.get(key, default)
+
+
+def _normalize_attrs(attrs):
+    # Like html5lib, the first occurrence of a duplicated attribute wins, and
+    # a valueless attribute has an empty value.
+    result = {}
+    for key, value in attrs:
+        if key not in result:
+            result[key] = "" if value is None else value
+    return result
+
+
+# Elements whose content html5lib reads as text, besides <script> and
+# <style>, which HTMLParser already handles. <plaintext> never ends in
+# html5lib; it does at </plaintext> here.
+_RAW_TEXT_TAGS = frozenset([
+    "iframe", "noembed", "noframes", "plaintext", "textarea", "title", "xmp",
+])
+
+# Start tags that end SVG and MathML content, like html5lib.
+_BREAKOUT_TAGS = frozenset([
+    "b", "big", "blockquote", "body", "br", "center", "code", "dd", "div",
+    "dl", "dt", "em", "embed", "h1", "h2", "h3", "h4", "h5", "h6", "head",
+    "hr", "i", "img", "li", "listing", "menu", "meta", "nobr", "ol", "p",
+    "pre", "ruby", "s", "small", "span", "strike", "strong", "sub", "sup",
+    "table", "tt", "u", "ul", "var",
+])
+
+# SVG and MathML elements containing HTML again.
+_INTEGRATION_POINTS = frozenset([
+    "desc", "foreignobject", "mi", "mn", "mo", "ms", "mtext", "title",
+])
+
+
+def _is_breakout(tag, attrs):
+    if tag == "font":
+        return any(key in ("color", "face", "size") for key, _ in attrs)
+    return tag in _BREAKOUT_TAGS
+
+
+def _is_integration_point(tag, attrs):
+    if tag == "annotation-xml":
+        encoding = dict(attrs).get("encoding") or ""
+        return encoding.lower() in ("text/html", "application/xhtml+xml")
+    return tag in _INTEGRATION_POINTS
+
+
+class AnchorScanner(six.moves.html_parser.HTMLParser, object):
+    """Streaming tokenizer that only collects ``<base>`` and ``<a>`` tags.
+
+    Only the text directly inside an anchor (before any child element or
+    comment) is collected, matching ElementTree's ``text`` attribute.
+
+    Like html5lib, tags inside elements read as text (e.g. ``<title>``) are
+    ignored, and so are anchors in SVG and MathML content, which are not
+    HTML anchors.
+    """
+    def __init__(self):
+        kwargs = {"convert_charrefs": True} if six.PY3 else {}
+        six.moves.html_parser.HTMLParser.__init__(self, **kwargs)
+        self.bases = []
+        self.anchors = []
+        self._anchor = None
+        self._text = None
+        # Open SVG and MathML elements, as (tag, is integration point).
+        self._foreign = []
+
+    def _close_anchor(self):
+        if self._anchor is None:
+            return
+        self._finish_text()
+        self._anchor = None
+
+    def _finish_text(self):
+        if self._text is not None:
+            self._anchor.text = "".join(self._text) or None
+            self._text = None
+
+    def _in_foreign_content(self):
+        return self._foreign and not self._foreign[-1][1]
+
+    def handle_starttag(self, tag, attrs):
+        foreign = self._foreign
+        if foreign and not foreign[-1][1]:
+            if not _is_breakout(tag, attrs):
+                foreign.append((tag, _is_integration_point(tag, attrs)))
+                return
+            while self._in_foreign_content():
+                foreign.pop()
+        if tag == "a":
+            self._close_anchor()
+            self._anchor = Anchor(_normalize_attrs(attrs))
+            self._text = []
+            self.anchors.append(self._anchor)
+            return
+        if tag == "base":
+            self.bases.append(_normalize_attrs(attrs))
+            return
+        if self._anchor is not None:
+            self._finish_text()
+        if tag in ("svg", "math"):
+            foreign.append((tag, False))
+        elif tag in _RAW_TEXT_TAGS:
+            self.set_cdata_mode(tag)
+
+    def handle_endtag(self, tag):
+        if self._foreign and self._handle_foreign_endtag(tag):
+            return
+        if tag == "a":
+            self._close_anchor()
+
+    def _handle_foreign_endtag(self, tag):
+        # Returns whether the tag was handled as SVG or MathML.
+        foreign = self._foreign
+        for index in range(len(foreign) - 1, -1, -1):
+            if foreign[index][0] == tag:
+                del foreign[index:]
+                return True
+        if not self._in_foreign_content():
+            return False
+        if tag != "a" or self._anchor is None:
+            return True
+        del foreign[:]     # The HTML anchor closes the SVG too.
+        return False
+
+    def handle_data(self, data):
+        if self._text is not None:
+            self._text.append(data)
+
+    # Comments (including bogus ones) end an anchor's text, like elements.
+    def handle_comment(self, data):
+        if self._anchor is not None:
+            self._finish_text()
+
+    unknown_decl = handle_pi = handle_comment
+
+    # Python 2's HTMLParser can't convert references in text by itself.
+    def handle_entityref(self, name):
+        self.handle_data(six.moves.html_parser.HTMLParser.unescape(
+            self, "&{0};".format(name),
+        ))
+
+    def handle_charref(self, name):
+        self.handle_data(six.moves.html_parser.HTMLParser.unescape(
+            self, "&#{0};".format(name),
+        ))
+
+    def close(self):
+        six.moves.html_parser.HTMLParser.close(self)
+        self._close_anchor()
+
+    @property
+    def base_href(self):
+        """The first non-empty base URL, or `None`.
+        """
+        for attrs in self.bases:
+            href = attrs.get("href")
+            if href is not None:
+                return href or None
+        return None
+
+
+def scan_anchors(text):
+    """Tokenize HTML text and return the scanner holding the results.
+    """
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    scanner = AnchorScanner()
+    scanner.feed(text)
+    scanner.close()
+    return scanner
+
+
+class AnchorStream(object):
+    """Scan anchors out of HTML bytes, fed chunk by chunk.
+
+    ``feed()`` returns anchors completed by the chunk (i.e. the closing tag,
+    or whatever implies the anchor's end, has been seen), and ``close()``
+    returns the rest. Anchors are not kept after being returned.
+
+    The base URL (`base_href`) is settled when the first anchor is seen.
+    ``<base>`` is only valid in the document's head, so one appearing after
+    an anchor is ignored.
+    """
+    def __init__(self, transport_encoding=None):
+        self._decoder = HTMLDecoder(transport_encoding)
+        self._scanner = AnchorScanner()
+        self._pending_cr = False
+
+    def __repr__(self):
+        return "AnchorStream({0!r})".format(self._decoder.transport_encoding)
+
+    @property
+    def encoding(self):
+        return self._decoder.encoding
+
+    @property
+    def base_href(self):
+        return self._scanner.base_href
+
+    def _feed_text(self, text, final=False):
+        if self._pending_cr:
+            text = "\r" + text
+        # Hold back a trailing CR, in case the next chunk starts with LF.
+        self._pending_cr = not final and text.endswith("\r")
+        if self._pending_cr:
+            text = text[:-1]
+        if "\r" in text:
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+        self._scanner.feed(text)
+
+    def _pop_anchors(self, final):
+        anchors = self._scanner.anchors
+        count = len(anchors)
+        if not final and self._scanner._anchor is not None:
+            count -= 1  # Still open; text may continue in the next chunk.
+        completed = anchors[:count]
+        del anchors[:count]
+        return completed
+
+    def feed(self, chunk):
+        self._feed_text(self._decoder.decode(chunk))
+        return self._pop_anchors(final=False)
+
+    def close(self):
+        self._feed_text(self._decoder.decode(b"", final=True), final=True)
+        self._scanner.close()
+        return self._pop_anchors(final=True)
+
+
+# An <a> start tag (quoted attribute values may contain ">"), and the text
+# up to the next tag.
+_ANCHOR_BYTES_RE = re.compile(
+    br"""<a(?=[\s/>])((?:[^>"']+|"[^"]*"|'[^']*')*)>([^<]*)""",
+    re.IGNORECASE,
+)
+
+_ATTRIBUTE_RE = re.compile(
+    r"""([^\s/>"'=][^\s/>=]*)"""
+    r"""(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]*)))?""",
+)
+
+# Constructs changing how anchors are found or resolved, which need a real
+# parser: comments and CDATA may hide tags, raw text elements and foreign
+# content may contain text looking like tags (a title only if it does), and
+# <base> changes the base URL.
+_UNSAFE_BYTES_RE = re.compile(
+    br"<(?:!--|!\[CDATA\[|(?:base|script|style|textarea|xmp|iframe|noembed"
+    br"|noframes|noscript|plaintext|template|svg|math)(?=[\s/>]))"
+    br"|<title[^>]*>[^<]*<(?!/title)",
+    re.IGNORECASE,
+)
+
+
+def _decode_piece(value, encoding):
+    text = value.decode(encoding, "replace")
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+def _is_ascii_compatible(encoding):
+    try:
+        return u"<a>".encode(encoding) == b"<a>"
+    except (LookupError, UnicodeError):
+        return False
+
+
+def scan_anchor_bytes(content, transport_encoding=None):
+    """Pick anchors out of HTML bytes, without decoding the whole document.
+
+    `content` can be any bytes-like object, e.g. an `mmap.mmap`. Only the
+    attributes and text of anchors are decoded (with an encoding chosen like
+    `decode_html` does). This handles documents like those generated by
+    indexes and mirrors. `None` is returned for anything that needs a real
+    parser, such as comments, scripts, or a ``<base>`` tag.
+    """
+    encoding, _ = _sniff_encoding(
+        content[:_META_PRESCAN_SIZE], transport_encoding,
+    )
+    if not _is_ascii_compatible(encoding):
+        return None
+    if _UNSAFE_BYTES_RE.search(content):
+        return None
+    anchors = []
+    for tag, text in _ANCHOR_BYTES_RE.findall(content):
+        attrs = {}
+        for name, double, single, bare in _ATTRIBUTE_RE.findall(
+                _decode_piece(tag, encoding)):
+            name = name.lower()
+            if name in attrs:   # Like html5lib, the first occurrence wins.
+                continue
+            value = double or single or bare
+            if "&" in value:
+                value = _unescape_html(value)
+            attrs[name] = value
+        if text:
+            text = _decode_piece(text, encoding)
+            if "&" in text:
+                text = _unescape_html(text)
+        anchors.append(Anchor(attrs, text or None))
+    return anchors
@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Find the best entries of a package, without looking at all of them.
+"""
+
+import heapq
+import itertools
+
+import six
+
+from .fetchers import Fetcher
+from .filters import VersionFilter
+from .transports import Transport
+
+
+def _get_version(entry):
+    return entry.version
+
+
+class BestEntries(object):
+    """Keep the `n` best entries added, by `key`.
+
+    `key` is called with each entry, and defaults to the entry's version, so
+    the newest entries are kept. Entries are held in a bounded heap, so each
+    entry added costs one `key` call and at most ``O(log n)`` comparisons.
+    Fields not used by `key` are left unevaluated on `LazyEntry` instances.
+
+    Between entries with equal keys, ones added earlier are preferred.
+    """
+    def __init__(self, n=1, key=None):
+        if n < 1:
+            raise ValueError("n must be positive, not {0!r}".format(n))
+        self.n = n
+        self.key = _get_version if key is None else key
+        self._heap = []
+        self._counter = itertools.count()
+
+    def __repr__(self):
+        return "BestEntries(n={0!r})".format(self.n)
+
+    def __len__(self):
+        return len(self._heap)
+
+    @property
+    def full(self):
+        return len(self._heap) >= self.n
+
+    def add(self, entry):
+        # The counter is negated so later entries are evicted first on ties.
+        # It also makes items unique, so entries are never compared.
+        item = (self.key(entry), -next(self._counter), entry)
+        if self.full:
+            heapq.heappushpop(self._heap, item)
+        else:
+            heapq.heappush(self._heap, item)
+
+    def extend(self, entries):
+        for entry in entries:
+            self.add(entry)
+
+    def get_entries(self):
+        """Get the kept entries, best first.
+        """
+        return [entry for _, _, entry in sorted(self._heap, reverse=True)]
+
+
+def _iter_repository_entries(repository, package_name, transport, filters):
+    fetcher = Fetcher(repository, package_name)
+    accept = repository.accept_header
+    for endpoint in fetcher.iter_endpoints():
+        response = transport.fetch(endpoint, accept=accept)
+        if response.status == 404:  # Package does not exist.
+            continue
+        response.raise_for_status()
+        for entry in fetcher.iter_entries(
+                endpoint, response.source,
+                content_type=response.content_type, filters=filters):
+            yield entry
+
+
+def best(
+        repositories, package_name, n=1, key=None, filters=(),
+        transport=None):
+    """Get the `n` best entries of a package, best first.
+
+    `repositories` are in priority order: entries from an earlier repository
+    win over entries from later ones. Once `n` entries are found, later
+    repositories are not fetched at all, since they can't win. Within a
+    repository, entries are ranked with `key` (like `BestEntries`), after
+    being filtered with `filters`.
+
+    Endpoints are fetched one by one with `transport`. If this is `None`, a
+    new `Transport` is used, and closed before returning.
+    """
+    if transport is None:
+        transport = Transport()
+        try:
+            return best(repositories, package_name, n, key, filters, transport)
+        finally:
+            transport.close()
+    result = []
+    for repository in repositories:
+        entries = BestEntries(n - len(result), key)
+        entries.extend(_iter_repository_entries(
+            repository, package_name, transport, filters,
+        ))
+        result.extend(entries.get_entries())
+        if len(result) >= n:
+            break
+    return result
+
+
+def latest_matching(
+        repositories, package_name, specifier="", filters=(),
+        transport=None):
+    """Get entries of the newest version of a package matching `specifier`.
+
+    All entries of the version (e.g. the sdist and wheels) are returned, from
+    the first of `repositories` with any matching entry. Later repositories
+    are not fetched. An empty list is returned if no entry matches.
+
+    `specifier` (a string or `SpecifierSet`) is applied as a `VersionFilter`
+    in addition to `filters`, while entries are parsed. `transport` is used
+    like in `best`.
+    """
+    if transport is None:
+        transport = Transport()
+        try:
+            return latest_matching(
+                repositories, package_name, specifier, filters, transport,
+            )
+        finally:
+            transport.close()
+    filters = list(filters)
+    if not isinstance(specifier, six.string_types) or specifier:
+        filters.append(VersionFilter(specifier))
+    for repository in repositories:
+        latest = None
+        entries = []
+        for entry in _iter_repository_entries(
+                repository, package_name, transport, filters):
+            version = entry.version
+            if latest is None or version > latest:
+                latest = version
+                entries = [entry]
+            elif version == latest:
+                entries.append(entry)
+        if entries:
+            return entries
+    return []
@@ -1,14 +1,29 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import collections
+import errno
 import os
 import posixpath
+import threading
 
 from packaging.utils import canonicalize_name
 from six.moves import urllib_parse
 
 from .endpoints import Endpoint
-from .entries import list_from_paths, parse_from_html
+from .entries import (
+    _get_source_size, _get_stored_entries,
+    list_from_paths, parse_from_file, parse_from_html, parse_from_json,
+)
+from .filters import compile_filters
+from .indexes import DirectoryIndex, PageIndex, group_by_project
+from .instrumentation import Stopwatch
+from .utils import _get_content_identity
+
+
+SIMPLE_HTML_CONTENT_TYPE = "application/vnd.pypi.simple.v1+html"
+
+SIMPLE_JSON_CONTENT_TYPE = "application/vnd.pypi.simple.v1+json"
 
 
 def _is_filesystem_path(split_result):
@@ -23,10 +38,23 @@ def _is_filesystem_path(split_result):
     return False
 
 
+def _get_media_type(content_type):
+    if not content_type:
+        return None
+    return content_type.split(";", 1)[0].strip().lower()
+
+
 class _Repository(object):
 
-    def __init__(self, endpoint):
+    # Value for the Accept header when fetching a non-local endpoint, or
+    # `None` if the repository does not care.
+    accept_header = None
+
+    def __init__(self, endpoint, store=None, instrument=None):
         self._base_endpoint = endpoint
+        self._parsed_base_endpoint = None
+        self.store = store
+        self.instrument = instrument
 
     def __repr__(self):
         return "{name}({endpoint!r})".format(
@@ -35,50 +63,288 @@ class _Repository(object):
 
     @property
     def base_endpoint(self):
+        # Parsed on first access, so a relative path is resolved against the
+        # working directory when the repository is first used.
+        if self._parsed_base_endpoint is not None:
+            return self._parsed_base_endpoint
         endpoint = self._base_endpoint
         split_result = urllib_parse.urlsplit(endpoint)
         if _is_filesystem_path(split_result):
-            return Endpoint(True, os.path.normpath(os.path.abspath(endpoint)))
-        return Endpoint.from_url(split_result)
+            path = os.path.normpath(os.path.abspath(endpoint))
+            parsed = Endpoint(True, path)
+        else:
+            parsed = Endpoint.from_url(split_result)
+        self._parsed_base_endpoint = parsed
+        return parsed
+
+    def group_endpoints(self, package_names):
+        """Find endpoints to fetch for packages.
+
+        Returns a list of 2-tuples ``(endpoint, names)``. Each endpoint is
+        listed once, with canonical names of packages found on it.
+        """
+        groups = collections.OrderedDict()
+        for name in package_names:
+            name = canonicalize_name(name)
+            for endpoint in self.iter_endpoints(name):
+                names = groups.setdefault(endpoint, [])
+                if name not in names:
+                    names.append(name)
+        return list(groups.items())
+
+    def get_entries_many(
+            self, package_names, endpoint, source,
+            content_type=None, filters=()):
+        """Get entries of many packages from one endpoint.
+
+        This is like calling `get_entries` for each package name, but
+        subclasses may share work between packages. Returns a dict mapping
+        each package's canonical name to a list of entries.
+        """
+        return {
+            canonicalize_name(name): self.get_entries(
+                name, endpoint, source,
+                content_type=content_type, filters=filters,
+            )
+            for name in package_names
+        }
 
 
 class SimpleRepository(_Repository):
     """A repository compliant to PEP 503 "Simple Repository API".
+
+    PEP 691 JSON responses are also understood. Fetchers should send
+    `accept_header` with their requests to ask for them, and pass the
+    response's Content-Type into `get_entries` so the right parser is used.
+
+    If `store` (an `EntryStore`) is given, entries parsed from HTML pages
+    are saved in it, and loaded instead of parsing a page seen before.
+
+    `instrument` is an optional `Instrument` to report parsing measurements
+    to. This applies to the other repository classes as well.
+
+    A local endpoint is treated as a mirror on disk, with a directory per
+    project containing an ``index.html`` (e.g. as written by bandersnatch).
+    A fetcher may pass `None` as the content of a project's directory into
+    `get_entries`; the repository then memory-maps the page and scans it for
+    anchors (see `parse_from_file`). If `sidecar` is given, it is the name
+    of a PEP 691 JSON file in project directories (e.g. ``"index.v1_json"``)
+    to read instead of the page when it is at least as new.
     """
+    accept_header = ", ".join([
+        SIMPLE_JSON_CONTENT_TYPE,
+        "{0};q=0.2".format(SIMPLE_HTML_CONTENT_TYPE),
+        "text/html;q=0.01",
+    ])
+
+    def __init__(self, endpoint, store=None, instrument=None, sidecar=None):
+        super(SimpleRepository, self).__init__(
+            endpoint, store=store, instrument=instrument,
+        )
+        self.sidecar = sidecar
+
+    def _get_sidecar_path(self, directory, page_path):
+        if not self.sidecar:
+            return None
+        path = os.path.join(directory, self.sidecar)
+        try:
+            sidecar_mtime = os.stat(path).st_mtime
+        except OSError:
+            return None
+        try:
+            page_mtime = os.stat(page_path).st_mtime
+        except OSError:
+            return path
+        if sidecar_mtime < page_mtime:  # Stale.
+            return None
+        return path
+
+    def _get_mirror_entries(self, package_name, endpoint, filters):
+        directory = endpoint.value
+        page_path = os.path.join(directory, "index.html")
+        sidecar_path = self._get_sidecar_path(directory, page_path)
+        if sidecar_path is not None:
+            with open(sidecar_path, "rb") as f:
+                source = (f.read(), "utf-8")
+            return parse_from_json(
+                source, Endpoint(True, sidecar_path).as_url(), package_name,
+                filters=filters, instrument=self.instrument,
+            )
+        try:
+            return parse_from_file(
+                page_path, Endpoint(True, page_path).as_url(), package_name,
+                filters=filters, store=self.store, instrument=self.instrument,
+            )
+        except (IOError, OSError) as e:
+            if e.errno == errno.ENOENT:     # Project does not exist.
+                return []
+            raise
+
     def iter_endpoints(self, package_name):
         name = canonicalize_name(package_name)
         base_endpoint = self.base_endpoint
-        value = posixpath.join(base_endpoint.value, name, "")
+        if base_endpoint.local:
+            value = os.path.join(base_endpoint.value, name, "")
+        else:
+            value = posixpath.join(base_endpoint.value, name, "")
         yield base_endpoint._replace(value=value)
 
-    def get_entries(self, package_name, endpoint, html):
-        return parse_from_html(html, endpoint.as_url(), package_name)
+    def get_entries(
+            self, package_name, endpoint, source,
+            content_type=None, filters=()):
+        if source is None and endpoint.local:
+            return self._get_mirror_entries(package_name, endpoint, filters)
+        if _get_media_type(content_type) == SIMPLE_JSON_CONTENT_TYPE:
+            return parse_from_json(
+                source, endpoint.as_url(), package_name,
+                filters=filters, instrument=self.instrument,
+            )
+        return parse_from_html(
+            source, endpoint.as_url(), package_name,
+            filters=filters, store=self.store, instrument=self.instrument,
+        )
 
 
 class FlatHTMLRepository(_Repository):
     """A repository represented by a single HTML file.
 
     This is the non-directory variant of pip's --find-links.
+
+    Since the page usually lists files of many projects, it is parsed only
+    once, and indexed by project names. The index is reused for later
+    lookups as long as the page content stays the same. If `store` (an
+    `EntryStore`) is given, entries of each package are also saved in it,
+    so a later process does not need to parse the page again.
     """
+    accept_header = "text/html"
+
+    def __init__(self, endpoint, store=None, instrument=None):
+        super(FlatHTMLRepository, self).__init__(
+            endpoint, store=store, instrument=instrument,
+        )
+        self._page_indexes = {}     # {endpoint value: (identity, index)}
+        self._lock = threading.Lock()
+
     def iter_endpoints(self, package_name):
         yield self.base_endpoint
 
-    def get_entries(self, package_name, endpoint, html):
-        return parse_from_html(html, endpoint.as_url(), package_name)
+    def _get_page_index(self, endpoint, html, identity):
+        with self._lock:
+            cached = self._page_indexes.get(endpoint.value)
+        if cached is not None and cached[0] == identity:
+            return cached[1]
+        instrument = self.instrument
+        if instrument is not None:
+            stopwatch = Stopwatch()
+        index = PageIndex.from_html(html, endpoint.as_url())
+        if instrument is not None:
+            stopwatch.split("tokenize")
+            instrument.on_parse(
+                endpoint.as_url(), "flat", _get_source_size(html),
+                len(index), 0, stopwatch.timings,
+            )
+        with self._lock:
+            self._page_indexes[endpoint.value] = (identity, index)
+        return index
+
+    def _get_entries(
+            self, package_name, endpoint, html, identity, entry_filter):
+        if self.store is not None:
+            return _get_stored_entries(
+                self.store, endpoint.as_url(), identity,
+                package_name, entry_filter, lambda: self._get_page_index(
+                    endpoint, html, identity,
+                ).get_entries(package_name),
+                instrument=self.instrument,
+            )
+        index = self._get_page_index(endpoint, html, identity)
+        return index.get_entries(package_name, filters=entry_filter)
+
+    def get_entries(
+            self, package_name, endpoint, html,
+            content_type=None, filters=()):
+        return self._get_entries(
+            package_name, endpoint, html,
+            _get_content_identity(html), compile_filters(filters),
+        )
+
+    def get_entries_many(
+            self, package_names, endpoint, html,
+            content_type=None, filters=()):
+        # The page is only hashed once, not for each package.
+        identity = _get_content_identity(html)
+        entry_filter = compile_filters(filters)
+        return {
+            canonicalize_name(name): self._get_entries(
+                name, endpoint, html, identity, entry_filter,
+            )
+            for name in package_names
+        }
 
 
 class LocalDirectoryRepository(_Repository):
     """A repository represented by a directory on the local filesystem.
 
     This is the directory variant of pip's --find-links.
+
+    A fetcher may pass `None` as the directory listing into `get_entries`.
+    The repository then reads the directory itself, and keeps an index of
+    it, so a lookup only needs to look at files of the requested package.
+    The index is rebuilt when the directory's modification time changes, or
+    when `refresh` is called.
+
+    If `store` (an `EntryStore`) is given, entries are saved in it, and
+    loaded instead of matching filenames if the listing is unchanged.
     """
-    def __init__(self, endpoint):
-        super(LocalDirectoryRepository, self).__init__(endpoint)
+    def __init__(self, endpoint, store=None, instrument=None):
+        super(LocalDirectoryRepository, self).__init__(
+            endpoint, store=store, instrument=instrument,
+        )
         if not self.base_endpoint.local:
             raise ValueError("endpoint is not local")
+        self._index = None
+
+    def _get_index(self, root):
+        index = self._index
+        if index is None or index.root != root:
+            index = self._index = DirectoryIndex(root)
+        return index
+
+    def refresh(self):
+        """Drop the directory index, so it is rebuilt on next lookup.
+        """
+        if self._index is not None:
+            self._index.refresh()
 
     def iter_endpoints(self, package_name):
         yield self.base_endpoint
 
-    def get_entries(self, package_name, endpoint, paths):
-        return list_from_paths(paths, endpoint.value, package_name)
+    def get_entries(
+            self, package_name, endpoint, paths,
+            content_type=None, filters=()):
+        if paths is None:
+            paths = self._get_index(endpoint.value).get(package_name)
+        return list_from_paths(
+            paths, endpoint.value, package_name,
+            filters=filters, store=self.store, instrument=self.instrument,
+        )
+
+    def get_entries_many(
+            self, package_names, endpoint, paths,
+            content_type=None, filters=()):
+        if paths is None:
+            index = self._get_index(endpoint.value)
+            groups = {
+                canonicalize_name(name): index.get(name)
+                for name in package_names
+            }
+        else:   # Group the listing once instead of scanning it per package.
+            groups = group_by_project(paths)
+        result = {}
+        for name in package_names:
+            key = canonicalize_name(name)
+            result[key] = list_from_paths(
+                groups.get(key, ()), endpoint.value, name,
+                filters=filters, store=self.store, instrument=self.instrument,
+            )
+        return result
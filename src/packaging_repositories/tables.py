@@ -0,0 +1,195 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import bisect
+
+import packaging.version
+import six
+
+from .endpoints import Endpoint
+from .entries import Entry, make_hashes
+from .interning import intern_specifier, intern_version, parse_specifier
+
+
+def _get_release_prefix_bound(version):
+    # Smallest version above everything ``~=`` allows, e.g. 2.3.dev0 for
+    # ``~=2.2.1``, or 3.dev0 for ``~=2.2``.
+    release = list(version.release[:-1])
+    release[-1] += 1
+    return packaging.version.Version("{0}!{1}.dev0".format(
+        version.epoch, ".".join(str(part) for part in release),
+    ))
+
+
+class EntryTable(object):
+    """Entries of a project, stored column-wise.
+
+    Each field is kept in its own list, with names and requires-python
+    specifiers shared between rows, and hashes in compact `Hashes` mappings,
+    instead of one tuple (and one hashes dict) per entry. Rows are also
+    indexed by version, so `select` and `latest` bisect into the matching
+    version range instead of checking every entry.
+
+    Iterating through the table (or indexing into it) produces `Entry`
+    tuples. A table can be built from any iterable of entries.
+    """
+    def __init__(self, entries=()):
+        self._strings = {}
+        self._names = []
+        self._versions = []
+        self._endpoint_locals = []
+        self._endpoint_values = []
+        self._hashes = []
+        self._requires_pythons = []
+        self._gpg_sigs = []
+        self._order = None  # Row indexes sorted by version, built on demand.
+        self._sorted_versions = None
+        self.extend(entries)
+
+    def __repr__(self):
+        return "EntryTable(<{0} entries>)".format(len(self))
+
+    def __len__(self):
+        return len(self._versions)
+
+    def __iter__(self):
+        for row in range(len(self)):
+            yield self._get_entry(row)
+
+    def __getitem__(self, index):
+        rows = range(len(self))[index]
+        if isinstance(index, slice):
+            return [self._get_entry(row) for row in rows]
+        return self._get_entry(rows)
+
+    def _intern(self, value):
+        if value is None:
+            return None
+        return self._strings.setdefault(value, value)
+
+    def _get_entry(self, row):
+        return Entry(
+            self._names[row],
+            self._versions[row],
+            Endpoint(self._endpoint_locals[row], self._endpoint_values[row]),
+            self._hashes[row],
+            self._requires_pythons[row],
+            self._gpg_sigs[row],
+        )
+
+    def append(self, entry):
+        name, version, endpoint, hashes, requires_python, gpg_sig = entry
+        if isinstance(version, six.string_types):
+            version = intern_version(version)
+        if isinstance(requires_python, six.string_types):
+            requires_python = intern_specifier(requires_python)
+        self._names.append(self._intern(name))
+        self._versions.append(version)
+        self._endpoint_locals.append(endpoint.local)
+        self._endpoint_values.append(endpoint.value)
+        self._hashes.append(make_hashes(hashes))
+        self._requires_pythons.append(requires_python)
+        self._gpg_sigs.append(self._intern(gpg_sig))
+        self._order = self._sorted_versions = None
+
+    def extend(self, entries):
+        for entry in entries:
+            self.append(entry)
+
+    def to_entries(self):
+        """Convert the table into a list of `Entry` tuples.
+        """
+        return list(self)
+
+    def _get_index(self):
+        if self._order is None:
+            versions = self._versions
+            self._order = sorted(
+                range(len(versions)), key=versions.__getitem__,
+            )
+            self._sorted_versions = [versions[row] for row in self._order]
+        return self._order, self._sorted_versions
+
+    def _get_upper_bound(self, versions, version):
+        # Local versions sort after their public version, but still match
+        # specifiers such as ``<=1.0`` and ``==1.0``.
+        # Public versions are compared as versions, since ``1.0.0+local`` is
+        # still ``==1.0``.
+        index = bisect.bisect_right(versions, version)
+        while index < len(versions):
+            if intern_version(versions[index].public) != version:
+                break
+            index += 1
+        return index
+
+    def _get_bounds(self, specifier, versions):
+        """Narrow `versions` (sorted) down to the range `specifier` can match.
+
+        The range is a superset; versions in it still need to be checked.
+        """
+        import packaging.specifiers
+        lo, hi = 0, len(versions)
+        for spec in specifier:
+            if not isinstance(spec, packaging.specifiers.Specifier):
+                continue    # LegacySpecifier on old packaging versions.
+            if spec.operator in ("!=", "===") or spec.version.endswith("*"):
+                continue
+            try:
+                version = packaging.version.Version(spec.version)
+            except packaging.version.InvalidVersion:
+                continue
+            if spec.operator in (">=", "==", "~="):
+                lo = max(lo, bisect.bisect_left(versions, version))
+            elif spec.operator == ">":
+                lo = max(lo, bisect.bisect_right(versions, version))
+            if spec.operator in ("<=", "=="):
+                hi = min(hi, self._get_upper_bound(versions, version))
+            elif spec.operator == "<":
+                hi = min(hi, bisect.bisect_left(versions, version))
+            elif spec.operator == "~=":
+                bound = _get_release_prefix_bound(version)
+                hi = min(hi, bisect.bisect_left(versions, bound))
+        return lo, hi
+
+    def _iter_matching_rows(self, specifier, reverse=False):
+        if isinstance(specifier, six.string_types):
+            specifier = parse_specifier(specifier)
+        order, versions = self._get_index()
+        lo, hi = self._get_bounds(specifier, versions)
+        indexes = range(hi - 1, lo - 1, -1) if reverse else range(lo, hi)
+        matches = {}    # Checked once per version, not per entry.
+        for index in indexes:
+            version = versions[index]
+            try:
+                match = matches[version]
+            except KeyError:
+                match = matches[version] = specifier.contains(version)
+            if match:
+                yield order[index]
+
+    def select(self, specifier):
+        """Get entries with versions matching `specifier`.
+
+        `specifier` is a `SpecifierSet` or a string. Matching works like
+        `VersionFilter`. Entries are returned in ascending version order.
+        """
+        return [self._get_entry(row) for row in self._iter_matching_rows(
+            specifier,
+        )]
+
+    def latest(self, n=1, specifier=""):
+        """Get entries of the `n` latest versions matching `specifier`.
+
+        All entries (e.g. the sdist and wheels) of each version are returned,
+        in descending version order.
+        """
+        entries = []
+        seen = set()
+        for row in self._iter_matching_rows(specifier, reverse=True):
+            version = self._versions[row]
+            if version not in seen:
+                if len(seen) >= n:
+                    break
+                seen.add(version)
+            entries.append(self._get_entry(row))
+        return entries
@@ -0,0 +1,257 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import collections
+import os
+import threading
+import zlib
+
+from timeit import default_timer
+
+from six.moves import urllib_parse
+
+from .utils import guess_content_type, guess_encoding
+
+
+class HTTPError(IOError):
+    """Raised when a server responds with an error status.
+    """
+    def __init__(self, url, status):
+        super(HTTPError, self).__init__(
+            "{0} for url: {1}".format(status, url),
+        )
+        self.url = url
+        self.status = status
+
+
+def _make_headers(items):
+    import email.message    # Not needed until something is fetched.
+    headers = email.message.Message()
+    for key, value in items:
+        headers[key] = value
+    return headers
+
+
+class Response(object):
+    """Result of fetching an endpoint.
+
+    `headers` is a case-insensitive mapping, e.g. `email.message.Message`.
+    `content` is `None` for a local directory, which repositories know to
+    list by themselves.
+    """
+    __slots__ = ("url", "status", "headers", "content")
+
+    def __init__(self, url, status, headers, content):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.content = content
+
+    def __repr__(self):
+        return "Response({0!r}, {1!r})".format(self.url, self.status)
+
+    @property
+    def content_type(self):
+        return guess_content_type(self.headers)
+
+    @property
+    def source(self):
+        """Content in the form repositories' ``get_entries()`` expect.
+        """
+        if self.content is None:
+            return None
+        return (self.content, guess_encoding(self.headers))
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise HTTPError(self.url, self.status)
+
+
+def read_local(endpoint):
+    """Read a local endpoint into a response.
+
+    A directory is not read; repositories list it themselves. A path that
+    does not exist results in a 404 response.
+    """
+    path = endpoint.value
+    status = 200
+    if os.path.isdir(path):
+        content = None
+    elif not os.path.exists(path):
+        status, content = 404, None
+    else:
+        with open(path, "rb") as f:
+            content = f.read()
+    return Response(endpoint.as_url(), status, _make_headers([]), content)
+
+
+_MAX_REDIRECTS = 10
+
+
+class ConnectionPool(object):
+    """Keep-alive HTTP(S) connections, pooled per host.
+
+    This is thread-safe. Each request takes an idle connection to the host
+    (or opens a new one), and puts it back for reuse after the response is
+    read, up to `maxsize` idle connections per host.
+    """
+    def __init__(self, maxsize=8, timeout=30):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self._idle = collections.defaultdict(list)
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return "ConnectionPool(maxsize={0!r}, timeout={1!r})".format(
+            self.maxsize, self.timeout,
+        )
+
+    def _connect(self, scheme, netloc):
+        from six.moves import http_client   # Slow to import (with ssl).
+        if scheme == "https":
+            cls = http_client.HTTPSConnection
+        elif scheme == "http":
+            cls = http_client.HTTPConnection
+        else:
+            raise ValueError("unsupported scheme {0!r}".format(scheme))
+        return cls(netloc, timeout=self.timeout)
+
+    def _acquire(self, key):
+        with self._lock:
+            idle = self._idle[key]
+            if idle:
+                return idle.pop(), True
+        return self._connect(*key), False
+
+    def _release(self, key, connection):
+        with self._lock:
+            idle = self._idle[key]
+            if len(idle) < self.maxsize:
+                idle.append(connection)
+                return
+        connection.close()
+
+    def close(self):
+        with self._lock:
+            connections = [c for idle in self._idle.values() for c in idle]
+            self._idle.clear()
+        for connection in connections:
+            connection.close()
+
+    def _request_once(self, split_result, headers):
+        import socket
+        from six.moves import http_client
+        # Errors indicating a kept-alive connection was closed by the server,
+        # and the request should be retried on a fresh connection.
+        stale_connection_errors = (http_client.HTTPException, socket.error)
+        key = (split_result.scheme, split_result.netloc)
+        path = urllib_parse.urlunsplit(
+            ("", "", split_result.path or "/", split_result.query, ""),
+        )
+        while True:
+            connection, reused = self._acquire(key)
+            try:
+                connection.request("GET", path, headers=headers)
+                response = connection.getresponse()
+                content = response.read()
+            except stale_connection_errors:
+                connection.close()
+                if not reused:
+                    raise
+                continue    # Kept-alive connection went away; retry.
+            break
+        if response.will_close:
+            connection.close()
+        else:
+            self._release(key, connection)
+        return response.status, response.getheaders(), content
+
+    def request(self, url, headers=None):
+        """Make a GET request, following redirects.
+        """
+        headers = dict(headers or {})
+        headers.setdefault("Accept-Encoding", "gzip")
+        for _ in range(_MAX_REDIRECTS):
+            split_result = urllib_parse.urlsplit(url)
+            status, header_items, content = self._request_once(
+                split_result, headers,
+            )
+            response_headers = _make_headers(header_items)
+            location = response_headers.get("Location")
+            if status not in (301, 302, 303, 307, 308) or not location:
+                break
+            url = urllib_parse.urljoin(url, location)
+        else:
+            raise HTTPError(url, status)
+        if response_headers.get("Content-Encoding", "").lower() == "gzip":
+            content = zlib.decompress(content, 16 + zlib.MAX_WBITS)
+        return Response(url, status, response_headers, content)
+
+
+class Transport(object):
+    """Synchronous, standard-library-only access to endpoints.
+
+    Remote endpoints are fetched with keep-alive connections from a shared
+    `ConnectionPool`. Local files are read directly, and local directories
+    are left for the repository to list.
+
+    If `cache` (a `ResponseCache`) is given, remote responses are stored in
+    it, and reused when still fresh or revalidated by the server.
+
+    If `instrument` (an `Instrument`) is given, requests made over the
+    network and cache lookups are reported to it.
+    """
+    def __init__(self, pool=None, cache=None, instrument=None):
+        if pool is None:
+            pool = ConnectionPool()
+        self.pool = pool
+        self.cache = cache
+        self.instrument = instrument
+
+    def __repr__(self):
+        return "Transport({0!r}, cache={1!r})".format(self.pool, self.cache)
+
+    def _request(self, url, headers):
+        instrument = self.instrument
+        if instrument is None:
+            return self.pool.request(url, headers)
+        start = default_timer()
+        response = self.pool.request(url, headers)
+        instrument.on_fetch(
+            url, default_timer() - start,
+            len(response.content or b""), response.status,
+        )
+        return response
+
+    def fetch(self, endpoint, accept=None):
+        """Fetch an endpoint, returning a `Response`.
+
+        `accept` is an optional value for the Accept header, usually the
+        repository's ``accept_header``.
+        """
+        if endpoint.local:
+            return read_local(endpoint)
+        url = endpoint.value
+        headers = {}
+        if accept:
+            headers["Accept"] = accept
+        cache = self.cache
+        if cache is None:
+            return self._request(url, headers)
+        instrument = self.instrument
+        cached = cache.get(url, accept)
+        if cached is not None:
+            if cache.is_fresh(cached):
+                if instrument is not None:
+                    instrument.on_cache("responses", True)
+                return cached.response
+            headers.update(cached.get_validators())
+        response = self._request(url, headers)
+        if instrument is not None:
+            instrument.on_cache(
+                "responses", cached is not None and response.status == 304,
+            )
+        return cache.update(url, accept, response, cached)
+
+    def close(self):
+        self.pool.close()
@@ -1,12 +1,16 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-import cgi
+import hashlib
+import os
 import posixpath
 import re
 
 from packaging.utils import canonicalize_name
 from six import string_types
+from six.moves import urllib_parse
+
+from .interning import InternCache
 
 
 def package_names_match(a, b):
@@ -66,6 +70,21 @@ WHEEL_FILENAME_RE = re.compile(
 WHEEL_EXTENSION = ".whl"
 
 
+def _parse_content_type(value):
+    import email.message    # Not needed until something is fetched.
+    import email.utils
+    message = email.message.Message()
+    message["Content-Type"] = value
+    charset = message.get_param("charset")
+    if charset is not None:
+        charset = email.utils.collapse_rfc2231_value(charset)
+    return message.get_content_type(), charset
+
+
+# Responses of a server share a few Content-Type values.
+parse_content_type = InternCache(_parse_content_type, maxsize=64)
+
+
 def guess_encoding(headers):
     """Guess transport encoding from response headers.
 
@@ -75,7 +94,41 @@ def guess_encoding(headers):
     why not supply it to avoid duplication.
     """
     if headers and "Content-Type" in headers:
-        content_type, params = cgi.parse_header(headers["Content-Type"])
-        if "charset" in params:
-            return params["charset"]
+        _, charset = parse_content_type(headers["Content-Type"])
+        return charset
+    return None
+
+
+def guess_content_type(headers):
+    """Get the media type from response headers, without parameters.
+
+    This is useful to pass into a repository's ``get_entries()``, to choose
+    how the response should be parsed.
+    """
+    if headers and "Content-Type" in headers:
+        content_type, _ = parse_content_type(headers["Content-Type"])
+        return content_type
     return None
+
+
+def _get_content_identity(source):
+    """Digest of page content, as passed into a repository.
+
+    `source` is either text, or a 2-tuple of (content, encoding).
+    """
+    if isinstance(source, tuple):
+        content, encoding = source
+        identity = hashlib.sha1(content)
+        identity.update(repr(encoding).encode("ascii"))
+    else:
+        identity = hashlib.sha1(source.encode("utf-8"))
+    return identity.hexdigest()
+
+
+def _get_filename(endpoint):
+    """Name of the file an entry's endpoint points to.
+    """
+    if endpoint.local:
+        return os.path.basename(endpoint.value)
+    path = urllib_parse.urlsplit(endpoint.value).path
+    return urllib_parse.unquote(posixpath.basename(path))
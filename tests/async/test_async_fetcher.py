@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import asyncio
+
+from packaging_repositories import (
+    AsyncFetcher, AsyncSingleFlight, ConcurrencyLimits, Endpoint,
+    SimpleRepository, Transport, VersionFilter,
+)
+from packaging_repositories.transports import Response
+
+
+def run(coro):
+    """Lightweight backport of asyncio.run().
+    """
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+def test_async_fetcher(pip_index):
+    transport = Transport()
+
+    async def fetch(endpoint, headers):
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(
+            None, transport.pool.request, endpoint.value, headers,
+        )
+
+    async def main():
+        repo = SimpleRepository(pip_index.url + "/simple")
+        fetcher = AsyncFetcher(repo, "pip", fetch)
+        return [entry async for entry in VersionFilter(">=18")(fetcher)]
+
+    try:
+        entries = run(main())
+    finally:
+        transport.close()
+    assert sorted(str(e.version) for e in entries) == [
+        "18.0", "18.0", "18.1", "18.1",
+    ]
+
+
+class FakeTransport(object):
+    """Serve a page for every request, and record concurrency.
+
+    Requests to hosts in `hang` never finish.
+    """
+    def __init__(self, content=b"", hang=()):
+        self.content = content
+        self.hang = hang
+        self.active = {}
+        self.peak = 0
+        self.peak_per_host = 0
+        self.cancelled = 0
+
+    async def __call__(self, endpoint, headers):
+        host = endpoint.value.split("/")[2]
+        self.active[host] = self.active.get(host, 0) + 1
+        self.peak = max(self.peak, sum(self.active.values()))
+        self.peak_per_host = max(self.peak_per_host, self.active[host])
+        try:
+            if host in self.hang:
+                await asyncio.Event().wait()
+            else:
+                await asyncio.sleep(0.01)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        finally:
+            self.active[host] -= 1
+        return Response(endpoint.value, 200, {}, self.content)
+
+
+def test_async_fetcher_limits():
+    transport = FakeTransport()
+    limits = ConcurrencyLimits(total=5, per_host=2)
+
+    async def consume(fetcher):
+        return [entry async for entry in fetcher]
+
+    async def main():
+        fetchers = [
+            AsyncFetcher(
+                SimpleRepository("https://{0}.example.com/simple".format(i)),
+                "pip-{0}".format(j), transport, limits=limits,
+            )
+            for i in range(4)
+            for j in range(10)
+        ]
+        await asyncio.gather(*[consume(f) for f in fetchers])
+
+    run(main())
+    assert transport.peak == 5
+    assert transport.peak_per_host == 2
+
+
+class MirroredRepository(SimpleRepository):
+    """Look for each package on two hosts.
+    """
+    def iter_endpoints(self, package_name):
+        for host in ["fast.example.com", "slow.example.com"]:
+            url = "https://{0}/simple/{1}/".format(host, package_name)
+            yield Endpoint(False, url)
+
+
+def test_async_fetcher_cancel(read_data):
+    transport = FakeTransport(
+        read_data("simple-pip.html"), hang={"slow.example.com"},
+    )
+
+    async def main():
+        repo = MirroredRepository("https://example.com/simple")
+        async with AsyncFetcher(repo, "pip", transport) as fetcher:
+            entry = await fetcher.__anext__()
+        await asyncio.sleep(0)
+        return entry
+
+    entry = run(main())
+    assert entry.name == "pip"
+    assert transport.cancelled == 1
+    assert transport.active == {"fast.example.com": 0, "slow.example.com": 0}
+
+
+def test_async_fetchers_coalesce(read_data):
+    transport = FakeTransport(read_data("simple-pip.html"))
+    flight = AsyncSingleFlight()
+
+    async def consume(fetcher):
+        return [entry async for entry in fetcher]
+
+    async def main():
+        fetchers = [
+            AsyncFetcher(
+                SimpleRepository("https://example.com/simple"), "pip",
+                transport, filters=VersionFilter(">=18"), flight=flight,
+            )
+            for _ in range(3)
+        ]
+        return await asyncio.gather(*[consume(f) for f in fetchers])
+
+    results = run(main())
+    assert [len(entries) for entries in results] == [4, 4, 4]
+    assert transport.peak == 1
+    assert (flight.calls, flight.deduplicated) == (4, 2)
+
+
+def test_async_single_flight_cancel():
+    transport = FakeTransport(hang={"example.com"})
+    flight = AsyncSingleFlight()
+
+    async def main():
+        repo = SimpleRepository("https://example.com/simple")
+        fetchers = [
+            AsyncFetcher(repo, "pip", transport, flight=flight)
+            for _ in range(2)
+        ]
+        first, second = [
+            asyncio.ensure_future(fetcher.__anext__()) for fetcher in fetchers
+        ]
+        await asyncio.sleep(0.01)
+
+        # The second fetcher still waits for the shared request.
+        first.cancel()
+        await asyncio.sleep(0.01)
+        cancelled_early = transport.cancelled
+
+        second.cancel()
+        await asyncio.sleep(0.01)
+        return cancelled_early
+
+    assert run(main()) == 0
+    assert transport.cancelled == 1
+    assert transport.active == {"example.com": 0}
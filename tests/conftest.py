@@ -1,16 +1,118 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import hashlib
 import os
 import sys
+import threading
 
 import py
+import pytest
+
+from six.moves import BaseHTTPServer, socketserver
 
 
 ASYNC_DIR = py.path.local(os.path.abspath(__file__)).dirpath("async")
 
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
 
 def pytest_ignore_collect(path, config):
     # Ignore async tests if not supported.
     if sys.version_info < (3, 6) and path.common(ASYNC_DIR) == ASYNC_DIR:
         return True
+
+
+class IndexRequestHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """Serve pages registered on the server, with keep-alive and ETags.
+    """
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.requests.append((self.path, self.headers))
+        try:
+            content_type, body = self.server.pages[self.path]
+        except KeyError:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        etag = '"{0}"'.format(hashlib.sha1(body).hexdigest())
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class IndexServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    """Local stand-in for a package index.
+
+    Set ``pages[path] = (content_type, body)`` to serve a page. Requests
+    are recorded in ``requests``, and the number of accepted connections in
+    ``connections``.
+    """
+    daemon_threads = True
+
+    def __init__(self):
+        BaseHTTPServer.HTTPServer.__init__(
+            self, ("127.0.0.1", 0), IndexRequestHandler,
+        )
+        self.pages = {}
+        self.requests = []
+        self.connections = 0
+
+    @property
+    def url(self):
+        return "http://{0}:{1}".format(*self.server_address)
+
+    def process_request(self, request, client_address):
+        self.connections += 1
+        socketserver.ThreadingMixIn.process_request(
+            self, request, client_address,
+        )
+
+
+@pytest.fixture()
+def index_server():
+    server = IndexServer()
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _read_data(name):
+    with open(os.path.join(DATA_DIR, name), "rb") as f:
+        return f.read()
+
+
+@pytest.fixture()
+def read_data():
+    """Get a function to read a file in the data directory as bytes.
+    """
+    return _read_data
+
+
+@pytest.fixture()
+def pip_index(index_server):
+    """An `IndexServer` serving pip's simple page at ``/simple/pip/``.
+    """
+    index_server.pages["/simple/pip/"] = (
+        "text/html; charset=utf-8", _read_data("simple-pip.html"),
+    )
+    return index_server
@@ -10,15 +10,20 @@ import requests
 from packaging.specifiers import SpecifierSet
 from packaging.version import Version
 from packaging_repositories import (
-    Endpoint, guess_encoding,
+    BatchFetcher, Endpoint, guess_content_type, guess_encoding,
     Entry, Fetcher,
-    FlatHTMLRepository, SimpleRepository, VersionFilter,
+    FlatHTMLRepository, LocalDirectoryRepository, SimpleRepository,
+    VersionFilter,
 )
 
 
 def iter_all_entries(fetcher):
     session = requests.session()
+    headers = {}
+    if fetcher._repository.accept_header:
+        headers["Accept"] = fetcher._repository.accept_header
     for endpoint in fetcher.iter_endpoints():
+        content_type = None
         if endpoint.local:
             path = endpoint.value
             if os.path.isdir(path):
@@ -27,10 +32,11 @@ def iter_all_entries(fetcher):
                 with open(path, "rb") as f:
                     src = (f.read(), None)
         else:
-            response = session.get(endpoint.value)
+            response = session.get(endpoint.value, headers=headers)
             response.raise_for_status()
             src = (response.content, guess_encoding(response.headers))
-        for entry in fetcher.iter_entries(endpoint, src):
+            content_type = guess_content_type(response.headers)
+        for entry in fetcher.iter_entries(endpoint, src, content_type):
             yield entry
 
 
@@ -91,3 +97,114 @@ def test_flat_match_filter(flat_repo):
 def test_flat_match_filter_nomatch(flat_repo):
     fetcher = RequestsFetcher(flat_repo, "jinja2")
     assert len(list(VersionFilter(">2.10")(fetcher))) == 0
+
+
+def test_simple_json_matches_html():
+    repo = SimpleRepository("https://pypi.org/simple")
+    endpoint, = repo.iter_endpoints("pip")
+    with open(get_data("simple-pip.html"), "rb") as f:
+        html_entries = repo.get_entries("pip", endpoint, (f.read(), None))
+    with open(get_data("simple-pip.json"), "rb") as f:
+        json_entries = repo.get_entries(
+            "pip", endpoint, (f.read(), None),
+            content_type="application/vnd.pypi.simple.v1+json",
+        )
+    assert json_entries == html_entries
+    assert len(json_entries) == 10
+
+
+def test_local_directory_index(tmpdir):
+    for name in [
+        "Jinja2-2.10-py2.py3-none-any.whl", "jinja2-2.9.tar.gz",
+        "jinja2_time-0.2.0.tar.gz", "MarkupSafe-1.0.tar.gz",
+    ]:
+        tmpdir.join(name).write("")
+    repo = LocalDirectoryRepository(str(tmpdir))
+    endpoint, = repo.iter_endpoints("jinja2")
+
+    def get_versions(name):
+        entries = repo.get_entries(name, endpoint, None)
+        return sorted(str(entry.version) for entry in entries)
+
+    assert get_versions("jinja2") == ["2.10", "2.9"]
+    assert get_versions("jinja2-time") == ["0.2.0"]
+
+    # Adding a file changes the directory's mtime, but the timestamp may be
+    # too coarse to notice in a test. Refresh explicitly instead.
+    tmpdir.join("Jinja2-2.11.0-py2.py3-none-any.whl").write("")
+    repo.refresh()
+    assert get_versions("jinja2") == ["2.10", "2.11.0", "2.9"]
+
+    # The index is used only if no listing is passed in.
+    paths = [str(tmpdir.join("MarkupSafe-1.0.tar.gz"))]
+    assert list(repo.get_entries("markupsafe", endpoint, paths)) == list(
+        repo.get_entries("markupsafe", endpoint, None),
+    )
+
+
+def test_flat_page_parsed_once(flat_repo, monkeypatch):
+    from packaging_repositories import indexes
+
+    calls = []
+    parse_anchors = indexes._parse_anchors
+
+    def _parse_anchors(*args):
+        calls.append(args)
+        return parse_anchors(*args)
+
+    monkeypatch.setattr(indexes, "_parse_anchors", _parse_anchors)
+
+    endpoint, = flat_repo.iter_endpoints("jinja2")
+    with open(endpoint.value, "rb") as f:
+        html = (f.read(), None)
+    for name in ["jinja2", "markupsafe", "pip", "Jinja2"]:
+        flat_repo.get_entries(name, endpoint, html)
+    assert len(calls) == 1
+
+    entries = flat_repo.get_entries("markupsafe", endpoint, html)
+    assert [str(e.version) for e in entries] == ["1.0"]
+
+    # Changed content is parsed again.
+    flat_repo.get_entries("jinja2", endpoint, (html[0] + b"\n", None))
+    assert len(calls) == 2
+
+
+def test_batch_flat(flat_repo):
+    fetcher = BatchFetcher(
+        flat_repo, ["Jinja2", "markupsafe", "pip", "jinja2"],
+    )
+    endpoint, = fetcher.iter_endpoints()
+    with open(endpoint.value, "rb") as f:
+        sources = {endpoint: (f.read(), None)}
+    result = fetcher.collect(sources)
+    assert sorted(result) == ["jinja2", "markupsafe", "pip"]
+    assert [str(e.version) for e in result["jinja2"]] == ["2.10"]
+    assert [str(e.version) for e in result["markupsafe"]] == ["1.0"]
+    assert result["pip"] == []
+
+
+def test_batch_simple():
+    pypi = SimpleRepository("https://pypi.org/simple")
+    fetcher = BatchFetcher(pypi, ["pip", "Django", "django"])
+    assert [e.value for e in fetcher.iter_endpoints()] == [
+        "https://pypi.org/simple/pip/",
+        "https://pypi.org/simple/django/",
+    ]
+
+
+@pytest.mark.parametrize(
+    ("value", "content_type", "encoding"),
+    [
+        ("text/html; charset=UTF-8", "text/html", "UTF-8"),
+        ('Text/HTML; Charset="iso-8859-1"', "text/html", "iso-8859-1"),
+        (
+            "application/vnd.pypi.simple.v1+json",
+            "application/vnd.pypi.simple.v1+json", None,
+        ),
+    ],
+)
+def test_guess_from_headers(value, content_type, encoding):
+    headers = {"Content-Type": value}
+    assert guess_content_type(headers) == content_type
+    assert guess_encoding(headers) == encoding
+    assert guess_content_type({}) is guess_encoding({}) is None
@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import sqlite3
+
+import pytest
+
+from packaging_repositories import (
+    Endpoint, EntryStore, ResponseCache, SimpleRepository, ThreadPoolFetcher,
+    Transport, VersionFilter,
+)
+from packaging_repositories import entries
+
+
+def test_revalidate(pip_index, tmpdir):
+    cache = ResponseCache(str(tmpdir))
+    repo = SimpleRepository(pip_index.url + "/simple")
+
+    transport = Transport(cache=cache)
+    for _ in range(2):
+        fetcher = ThreadPoolFetcher([(repo, "pip")], transport)
+        assert len(list(fetcher)) == 10
+    transport.close()
+
+    first, second = [headers for _, headers in pip_index.requests]
+    assert "If-None-Match" not in first
+    assert second["If-None-Match"] == cache.get(
+        pip_index.url + "/simple/pip/", repo.accept_header,
+    ).response.headers["ETag"]
+
+
+def test_max_age(pip_index, tmpdir):
+    transport = Transport(cache=ResponseCache(str(tmpdir), max_age=60))
+    endpoint = Endpoint(False, pip_index.url + "/simple/pip/")
+    responses = [transport.fetch(endpoint) for _ in range(3)]
+    transport.close()
+    assert len(pip_index.requests) == 1
+    assert len(set(r.content for r in responses)) == 1
+    assert responses[-1].content_type == "text/html"
+    assert responses[-1].source[1] == "utf-8"
+
+
+def test_evict(index_server, tmpdir, read_data):
+    body = read_data("simple-pip.html")
+    cache = ResponseCache(str(tmpdir), max_size=int(len(body) * 2.5))
+    transport = Transport(cache=cache)
+    for name in ["a", "b", "c"]:
+        index_server.pages["/simple/{0}/".format(name)] = ("text/html", body)
+    urls = [index_server.url + "/simple/{0}/".format(n) for n in "abc"]
+
+    for url in urls[:2]:
+        transport.fetch(Endpoint(False, url))
+    os.utime(cache._get_path(urls[0], None), (0, 0))  # Least recent.
+    transport.fetch(Endpoint(False, urls[2]))
+    transport.close()
+
+    assert cache.get(urls[0]) is None
+    assert cache.get(urls[1]) is not None
+    assert cache.get(urls[2]) is not None
+
+
+PIP_URL = "https://pypi.org/simple/pip/"
+
+
+def test_entry_store(tmpdir, monkeypatch, read_data):
+    html = (read_data("simple-pip.html"), "utf-8")
+    store = EntryStore(str(tmpdir.join("entries.db")))
+    expected = entries.parse_from_html(html, PIP_URL, "pip")
+    filters = [VersionFilter(">=10")]
+    expected_filtered = entries.parse_from_html(
+        html, PIP_URL, "pip", filters=filters,
+    )
+    assert entries.parse_from_html(html, PIP_URL, "pip", store=store) == (
+        expected
+    )
+
+    def fail(*args):
+        raise AssertionError("parsed again")
+
+    monkeypatch.setattr(entries, "_parse_anchors", fail)
+    assert entries.parse_from_html(html, PIP_URL, "pip", store=store) == (
+        expected
+    )
+
+    # Filters are applied to stored entries too.
+    assert entries.parse_from_html(
+        html, PIP_URL, "pip", filters=filters, store=store,
+    ) == expected_filtered
+
+    # Changed content is parsed again.
+    with pytest.raises(AssertionError):
+        entries.parse_from_html(
+            (html[0] + b" ", "utf-8"), PIP_URL, "pip", store=store,
+        )
+
+
+def test_entry_store_paths(tmpdir):
+    store = EntryStore(str(tmpdir.join("entries.db")))
+    paths = ["six-1.11.0.tar.gz", "six-1.12.0-py2.py3-none-any.whl"]
+    expected = entries.list_from_paths(paths, "/root", "six")
+    for _ in range(2):
+        result = entries.list_from_paths(paths, "/root", "six", store=store)
+        assert result == expected
+    assert store.load("/root", "six", "nope") is None
+
+
+def test_entry_store_schema(tmpdir):
+    path = str(tmpdir.join("entries.db"))
+    store = EntryStore(path)
+    store.save(PIP_URL, "pip", "x", [])
+    assert store.load(PIP_URL, "pip", "x") == []
+    store.close()
+
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA user_version = 0")
+    connection.close()
+    assert EntryStore(path).load(PIP_URL, "pip", "x") is None
+
+
+def test_entry_store_evict(tmpdir, read_data):
+    html = (read_data("simple-pip.html"), "utf-8")
+    store = EntryStore(str(tmpdir.join("entries.db")), max_size=1)
+    entries.parse_from_html(html, PIP_URL, "pip", store=store)
+    store.max_size = 10 ** 6
+    entries.parse_from_html(html, PIP_URL + "a/", "pip", store=store)
+    entries.parse_from_html(html, PIP_URL + "b/", "pip", store=store)
+    identity = entries._get_content_identity(html)
+    assert store.load(PIP_URL, "pip", identity) is None
+    assert store.load(PIP_URL + "a/", "pip", identity) is not None
@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import threading
+import time
+
+import pytest
+
+from packaging_repositories import (
+    SimpleRepository, SingleFlight, ThreadPoolFetcher, VersionFilter,
+)
+from packaging_repositories.transports import Response
+
+
+def wait_for(predicate, timeout=5):
+    deadline = time.time() + timeout
+    while not predicate():
+        if time.time() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.001)
+
+
+def run_in_threads(funcs):
+    results = [None] * len(funcs)
+
+    def run(i, func):
+        results[i] = func()
+
+    threads = [
+        threading.Thread(target=run, args=(i, func))
+        for i, func in enumerate(funcs)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_single_flight_shares_result():
+    flight = SingleFlight()
+    calls = []
+
+    def work(value):
+        calls.append(value)
+        wait_for(lambda: flight.deduplicated == 2)
+        return [value]
+
+    results = run_in_threads([
+        lambda: flight.do("key", work, 1) for _ in range(3)
+    ])
+    assert calls == [1]
+    assert results == [[1], [1], [1]]
+    assert results[0] is results[1] is results[2]
+    assert (flight.calls, flight.deduplicated) == (3, 2)
+
+
+def test_single_flight_shares_exception():
+    flight = SingleFlight()
+
+    def work():
+        wait_for(lambda: flight.deduplicated == 1)
+        raise ValueError("nope")
+
+    def call():
+        with pytest.raises(ValueError):
+            flight.do("key", work)
+        return True
+
+    assert run_in_threads([call, call]) == [True, True]
+
+
+def test_single_flight_does_not_cache():
+    flight = SingleFlight()
+    calls = []
+    for _ in range(2):
+        flight.do("key", calls.append, None)
+    assert len(calls) == 2
+    assert flight.deduplicated == 0
+
+
+class HeldTransport(object):
+    """Serve a page, but hold each response until `release` returns true.
+    """
+    def __init__(self, content, release):
+        self.content = content
+        self.release = release
+        self.requests = 0
+
+    def fetch(self, endpoint, accept=None):
+        self.requests += 1
+        wait_for(self.release)
+        headers = {"Content-Type": "text/html; charset=utf-8"}
+        return Response(endpoint.value, 200, headers, self.content)
+
+
+def test_thread_pool_fetchers_coalesce(read_data):
+    flight = SingleFlight()
+    transport = HeldTransport(
+        read_data("simple-pip.html"), lambda: flight.deduplicated,
+    )
+
+    def resolve():
+        repo = SimpleRepository("https://example.com/simple")
+        return list(ThreadPoolFetcher(
+            [(repo, "pip")], transport, flight=flight,
+        ))
+
+    first, second = run_in_threads([resolve, resolve])
+    assert len(first) == len(second) == 10
+    assert transport.requests == 1
+
+    # Both fetchers asked for entries; only one of them downloaded.
+    assert (flight.calls, flight.deduplicated) == (3, 1)
+
+
+def test_thread_pool_fetcher_single_filter(read_data):
+    transport = HeldTransport(read_data("simple-pip.html"), lambda: True)
+    repo = SimpleRepository("https://example.com/simple")
+    entries = list(ThreadPoolFetcher(
+        [(repo, "pip")], transport, filters=VersionFilter(">=18"),
+        flight=SingleFlight(),
+    ))
+    assert len(entries) == 4
+
+
+def test_thread_pool_fetchers_coalesce_equal_filters(read_data):
+    flight = SingleFlight()
+    transport = HeldTransport(
+        read_data("simple-pip.html"), lambda: flight.deduplicated,
+    )
+
+    def resolve():
+        repo = SimpleRepository("https://example.com/simple")
+        return list(ThreadPoolFetcher(
+            [(repo, "pip")], transport, filters=[VersionFilter(">=18")],
+            flight=flight,
+        ))
+
+    first, second = run_in_threads([resolve, resolve])
+    assert len(first) == len(second) == 4
+    assert transport.requests == 1
+    assert (flight.calls, flight.deduplicated) == (3, 1)
@@ -1,11 +1,24 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import pickle
+import threading
+
 import pytest
 
 import html5lib
 
-from packaging_repositories.entries import _parse_base_url
+from packaging.specifiers import SpecifierSet
+from packaging.version import Version
+from packaging_repositories import intern_cache_info
+from packaging_repositories.entries import (
+    EMPTY_HASHES, Entry, Hashes, IncrementalParser, LazyEntry,
+    _URLResolver, _iter_entries, _parse_base_url, _split_url,
+    iter_from_chunks,
+    list_from_paths, make_hashes, parse_from_file, parse_from_html,
+)
+from packaging_repositories.endpoints import Endpoint
+from packaging_repositories.parsers import scan_anchor_bytes
 
 
 @pytest.mark.parametrize(
@@ -33,3 +46,326 @@ def test_base_url(html, url, expected):
         html, transport_encoding=None, namespaceHTMLElements=False,
     )
     assert _parse_base_url(document, url) == expected
+
+
+FOO_ANCHOR = b'<a href="x/foo-1.0.tar.gz">foo-1.0.tar.gz</a>'
+
+
+@pytest.mark.parametrize(
+    ("source", "package_name"),
+    [
+        ("links.html", "jinja2"),
+        ("links.html", "markupsafe"),
+        ("simple-pip.html", "pip"),
+        ("simple-six.html", "six"),
+        # Comments end the text of an anchor, like child elements.
+        (b"<a href=x/foo-1.0.tar.gz>foo-<!-- c -->1.0.tar.gz</a>", "foo"),
+        (b"<a href=x/foo-1.0.tar.gz>foo-<?pi>1.0.tar.gz</a>", "foo"),
+        (b"<a href=x/foo-1.0.tar.gz>foo-<![CDATA[x]]>1.0.tar.gz</a>", "foo"),
+        # Tags in elements read as text are not tags.
+        (b"<title>" + FOO_ANCHOR + b"</title>" + FOO_ANCHOR, "foo"),
+        (b"<textarea>" + FOO_ANCHOR + b"</textarea>", "foo"),
+        (b"<xmp>" + FOO_ANCHOR + b"</xmp>", "foo"),
+        (b"<iframe>" + FOO_ANCHOR + b"</iframe>", "foo"),
+        # Anchors in SVG and MathML are not HTML anchors, unless in an
+        # integration point, or after a tag breaking out of them.
+        (b"<svg><g>" + FOO_ANCHOR + b"</g></svg>" + FOO_ANCHOR, "foo"),
+        (b"<math>" + FOO_ANCHOR + b"</math>", "foo"),
+        (b"<svg><title>" + FOO_ANCHOR + b"</title></svg>", "foo"),
+        (b"<svg><foreignObject>" + FOO_ANCHOR + b"</foreignObject>", "foo"),
+        (b"<svg><p>" + FOO_ANCHOR + b"</p></svg>", "foo"),
+        (b"<svg><font>" + FOO_ANCHOR + b"</font></svg>", "foo"),
+        (b"<svg/>" + FOO_ANCHOR, "foo"),
+    ],
+)
+@pytest.mark.parametrize("as_bytes", [True, False])
+def test_stdlib_parser_matches_html5lib(
+        source, package_name, as_bytes, read_data):
+    content = source if isinstance(source, bytes) else read_data(source)
+    html = (content, None) if as_bytes else content.decode("utf-8")
+    page_url = "https://example.com/{0}/".format(package_name)
+
+    expected = parse_from_html(html, page_url, package_name, parser="html5lib")
+    if content is not source:
+        assert expected, "test page should contain entries"
+    assert parse_from_html(html, page_url, package_name, parser="stdlib") == (
+        expected
+    )
+    assert list(iter_from_chunks(
+        iter_chunks(content, 7), page_url, package_name,
+    )) == expected
+
+
+@pytest.mark.parametrize(
+    ("filename", "package_name"),
+    [
+        ("links.html", "jinja2"),
+        ("simple-pip.html", "pip"),
+        ("simple-six.html", "six"),
+    ],
+)
+def test_parse_from_file(filename, package_name, read_data, tmpdir):
+    content = read_data(filename)
+    path = str(tmpdir.join(filename))
+    with open(path, "wb") as f:
+        f.write(content)
+    page_url = Endpoint(True, path).as_url()
+
+    expected = parse_from_html((content, None), page_url, package_name)
+    assert parse_from_file(path, page_url, package_name) == expected
+
+
+@pytest.mark.parametrize("html", [
+    b'<a href="foo-1.0.tar.gz">foo-1.0.tar.gz</a>',
+    b"<A HREF='foo-1.0.tar.gz' href=x>foo-1.0.tar.gz</A>",
+    b'<a href=foo-1.0.tar.gz data-requires-python="&gt;=3.6">'
+    b"foo-1.0.tar.gz<br>ignored</a>",
+    b'<a data-x="a>b" href="foo-1.0.tar.gz#sha256=00">foo&#45;1.0.tar.gz</a>',
+    b'<a\r\nhref="foo-1.0.tar.gz"\r\n>foo-1.0.tar.gz\r\n</a>',
+    b'<a href="foo-\xc3\xa9-1.0.tar.gz">foo-1.0.tar.gz</a>',
+    b"<a href=foo-1.0.tar.gz></a><a>foo-1.0.tar.gz</a><abbr>x</abbr>",
+    b"<title>Links for foo</title><a href=foo-1.0.zip>foo-1.0.zip</a>",
+])
+def test_scan_anchor_bytes(html):
+    page_url = "https://example.com/foo/"
+    # Undeclared encodings are decoded like the stdlib parser does.
+    expected = parse_from_html((html, None), page_url, "foo", "stdlib")
+    anchors = scan_anchor_bytes(html)
+    assert anchors is not None
+    entries = list(_iter_entries(anchors, page_url, "foo"))
+    assert entries == expected
+
+
+@pytest.mark.parametrize("html", [
+    b'<!-- <a href="foo-1.0.tar.gz">foo-1.0.tar.gz</a> -->',
+    b'<base href="https://example.com/">',
+    b'<script>"<a href=foo-1.0.tar.gz>foo-1.0.tar.gz</a>"</script>',
+    b'<title><a href=foo-1.0.tar.gz>foo-1.0.tar.gz</a></title>',
+    b'\xff\xfe<\x00a\x00>\x00',
+])
+def test_scan_anchor_bytes_unsafe(html, tmpdir):
+    assert scan_anchor_bytes(html) is None
+
+    # The file is parsed properly instead.
+    path = tmpdir.join("index.html")
+    path.write_binary(html)
+    page_url = "https://example.com/foo/"
+    assert parse_from_file(str(path), page_url, "foo") == parse_from_html(
+        (html, None), page_url, "foo",
+    )
+
+
+def test_parse_from_file_empty(tmpdir):
+    path = tmpdir.join("index.html")
+    path.write_binary(b"")
+    assert parse_from_file(str(path), "https://example.com/", "foo") == []
+
+
+def iter_chunks(content, size):
+    for i in range(0, len(content), size):
+        yield content[i:i + size]
+
+
+@pytest.mark.parametrize(
+    ("filename", "package_name"),
+    [
+        ("links.html", "jinja2"),
+        ("simple-pip.html", "pip"),
+        ("simple-six.html", "six"),
+    ],
+)
+@pytest.mark.parametrize("chunk_size", [1, 7, 4096])
+def test_incremental_parser(filename, package_name, chunk_size, read_data):
+    content = read_data(filename)
+    page_url = "https://example.com/{0}/".format(package_name)
+
+    expected = parse_from_html((content, None), page_url, package_name)
+    result = list(iter_from_chunks(
+        iter_chunks(content, chunk_size), page_url, package_name,
+    ))
+    assert result == expected
+
+
+def test_incremental_parser_yields_early():
+    parser = IncrementalParser("https://example.com/six/", "six")
+    assert parser.feed(
+        b'<html><head><base href="https://files.example.com/x/"></head>'
+        b'<body><a href="six-1.0.tar.gz">six-1.0.tar.gz</a>'
+        b'<a href="six-1.1.tar.gz">six-1.',
+    ) == []    # Not enough bytes to look for a <meta> charset yet.
+    entries = parser.feed(b"1.tar.gz" + b" " * 1024)
+    assert [e.endpoint.value for e in entries] == [
+        "https://files.example.com/x/six-1.0.tar.gz",
+    ]
+    entries = parser.feed(b"</a></body></html>")
+    assert [str(e.version) for e in entries] == ["1.1"]
+    assert parser.close() == []
+
+
+NON_ASCII_PAGE = u"<a href='caf\xe9/six-1.0.zip'>six-1.0.zip</a>"
+
+
+@pytest.mark.parametrize(
+    ("content", "transport_encoding"),
+    [
+        (NON_ASCII_PAGE.encode("cp1252"), None),
+        (NON_ASCII_PAGE.encode("utf-8"), None),
+        (NON_ASCII_PAGE.encode("utf-16"), None),
+        (NON_ASCII_PAGE.encode("utf-8"), "utf-8"),
+        ((u"<meta charset=latin1>" + NON_ASCII_PAGE).encode("latin1"), None),
+    ],
+)
+def test_incremental_parser_encoding(content, transport_encoding):
+    result = list(iter_from_chunks(
+        iter_chunks(content, 3), "https://example.com/", "six",
+        transport_encoding=transport_encoding,
+    ))
+    assert [e.endpoint.value for e in result] == [
+        "https://example.com/caf%e9/six-1.0.zip",
+    ]
+
+
+def test_lazy_entry(read_data):
+    html = (read_data("simple-pip.html"), None)
+    url = "https://example.com/pip/"
+    entry = parse_from_html(html, url, "pip")[0]
+    assert isinstance(entry, LazyEntry)
+
+    # Nothing besides the version is evaluated to check it.
+    assert entry.version == Version("9.0.0")
+    assert isinstance(entry._requires_python, str)
+    assert entry._resolver is not None
+
+    name, version, endpoint, hashes, requires_python, gpg_sig = entry
+    assert entry == Entry(
+        name, version, endpoint, hashes, requires_python, gpg_sig,
+    )
+    assert entry[1:3] == (version, endpoint)
+    assert requires_python == SpecifierSet(">=2.6,!=3.0.*,!=3.1.*,!=3.2.*")
+    assert list(hashes) == ["sha256"]
+    assert entry._replace(gpg_sig="true").gpg_sig == "true"
+
+
+class BlockingResolver(_URLResolver):
+    """Block the first lookup of ``resolve`` until `release` is set.
+    """
+    def __init__(self, base_url):
+        super(BlockingResolver, self).__init__(base_url)
+        self.blocked = threading.Event()
+        self.release = threading.Event()
+
+    @property
+    def resolve(self):
+        if not self.blocked.is_set():
+            self.blocked.set()
+            self.release.wait(5)
+        return super(BlockingResolver, self).resolve
+
+
+def test_lazy_entry_threads():
+    base_url = "https://example.com/simple/foo/"
+    href = "../../files/foo-1.0.tar.gz#sha256=" + "0" * 64
+    expected = LazyEntry("foo", "1.0", href, None, "", "", base_url)
+    resolver = BlockingResolver(base_url)
+    entry = LazyEntry("foo", "1.0", href, None, "", "", resolver)
+    results = []
+
+    def resolve():
+        try:
+            results.append(entry.endpoint)
+        except Exception as e:
+            results.append(e)
+
+    # The thread sees an unresolved entry, and stops right before resolving.
+    thread = threading.Thread(target=resolve)
+    thread.start()
+    try:
+        assert resolver.blocked.wait(5)
+        assert entry.endpoint == expected.endpoint
+        assert entry.hashes == expected.hashes
+    finally:
+        resolver.release.set()
+        thread.join()
+
+    # It resolves the href again, not the endpoint published meanwhile.
+    assert results == [expected.endpoint]
+    assert entry == expected
+
+
+def test_interned_fields(read_data):
+    html = (read_data("simple-pip.html"), None)
+    entries = parse_from_html(html, "https://example.com/pip/", "pip")
+    wheel, sdist = entries[:2]
+    assert wheel.version is sdist.version
+    assert wheel.requires_python is sdist.requires_python
+
+    info = intern_cache_info()
+    assert info["versions"].hits > 0
+    assert info["specifiers"].hits > 0
+
+
+def test_hashes():
+    digest = "ab" * 32
+    hashes = make_hashes([("md5", "00"), ("sha256", digest), ("md5", "FF")])
+    assert hashes == {"sha256": digest, "md5": "FF"}
+    assert {"sha256": digest, "md5": "FF"} == hashes
+    assert hashes["sha256"] == digest
+    assert hashes.get("sha1") is None
+    assert pickle.loads(pickle.dumps(hashes)) == hashes
+    assert make_hashes(hashes) is hashes
+    assert make_hashes({}) is EMPTY_HASHES
+    with pytest.raises(TypeError):
+        hashes["sha1"] = digest
+
+
+def test_compact_fields(read_data):
+    html = (read_data("simple-pip.html"), None)
+    entries = parse_from_html(html, "https://example.com/pip/", "pip")
+    assert all(isinstance(entry.hashes, Hashes) for entry in entries)
+    assert entries[0].hashes == {
+        "sha256": (
+            "1c60d02587af46d234182df22f590168abb7d923fad8807d1aadf1cf6185b2c2"
+        ),
+    }
+    assert not hasattr(entries[0], "__dict__")
+
+    wheel, sdist = list_from_paths(
+        ["six-1.0-py2.py3-none-any.whl", "six-1.0.tar.gz"], "/", "six",
+    )
+    assert wheel.hashes is sdist.hashes is EMPTY_HASHES
+    assert wheel.name is sdist.name
+
+
+@pytest.mark.parametrize("base_url", [
+    "https://pypi.org/simple/pip/",
+    "https://pypi.org/simple/pip",
+    "https://pypi.org",
+    "https://pypi.org/a//b/",
+    "https://pypi.org/a/./b/",
+    "https://pypi.org/simple/p i p/",
+    "https://pypi.org/simple/?q=1",
+    "/simple/pip/",
+])
+@pytest.mark.parametrize("href", [
+    "../../packages/ab/cd/pip-1.0.tar.gz#sha256=00ff",
+    "../../../../../pip-1.0.tar.gz",
+    "pip-1.0.tar.gz",
+    "./pip-1.0.tar.gz",
+    "a/../pip-1.0.tar.gz",
+    "a//pip-1.0.tar.gz",
+    "/packages/pip-1.0.tar.gz#md5=00",
+    "//files.example.com/pip-1.0.tar.gz",
+    "https://files.example.com/a/../pip-1.0.tar.gz#sha256=00",
+    "HTTPS://files.example.com/pip-1.0.tar.gz",
+    "pip-1.0.tar.gz?x=1#sha1=00",
+    "pip 1.0.tar.gz#sha256=00",
+    "pip-1.0.tar.gz#",
+    "#sha256=00",
+    "..",
+    "../",
+    "mailto:pip@example.com",
+])
+def test_url_resolver(base_url, href):
+    split_result = _split_url(base_url, href)
+    expected = (Endpoint.from_url(split_result), split_result.fragment)
+    assert _URLResolver(base_url).resolve(href) == expected
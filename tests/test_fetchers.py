@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import collections
+import os
+
+import pytest
+
+from packaging_repositories import (
+    AggregateFetcher, FlatHTMLRepository, LocalDirectoryRepository,
+    SimpleRepository, ThreadPoolFetcher, VersionFilter,
+)
+
+
+@pytest.fixture()
+def index(index_server, read_data):
+    index_server.pages.update({
+        "/simple/pip/": (
+            "application/vnd.pypi.simple.v1+json",
+            read_data("simple-pip.json"),
+        ),
+        "/simple/six/": ("text/html", read_data("simple-six.html")),
+        "/links.html": ("text/html; charset=utf-8", read_data("links.html")),
+    })
+    return index_server
+
+
+def count_names(entries):
+    return dict(collections.Counter(entry.name for entry in entries))
+
+
+def test_thread_pool_fetcher(index, tmpdir):
+    tmpdir.join("pip-18.1-py2.py3-none-any.whl").write("")
+    simple = SimpleRepository(index.url + "/simple")
+    flat = FlatHTMLRepository(index.url + "/links.html")
+    local = LocalDirectoryRepository(str(tmpdir))
+    pairs = [
+        (simple, "pip"), (simple, "six"), (simple, "does-not-exist"),
+        (flat, "jinja2"), (flat, "markupsafe"), (local, "pip"),
+    ]
+    with ThreadPoolFetcher(pairs, max_workers=4) as fetcher:
+        entries = list(fetcher)
+
+    assert count_names(entries) == {
+        "pip": 11, "six": 6, "jinja2": 1, "markupsafe": 1,
+    }
+    # The flat page is shared by two packages but fetched once.
+    paths = sorted(path for path, _ in index.requests)
+    assert paths == [
+        "/links.html",
+        "/simple/does-not-exist/", "/simple/pip/", "/simple/six/",
+    ]
+    accept = dict(index.requests)["/simple/pip/"]["Accept"]
+    assert accept == simple.accept_header
+
+
+def test_thread_pool_fetcher_keep_alive(index):
+    simple = SimpleRepository(index.url + "/simple")
+    pairs = [(simple, "pip"), (simple, "six"), (simple, "does-not-exist")]
+    fetcher = ThreadPoolFetcher(pairs, max_workers=1)
+    assert len(list(fetcher)) == 16
+    assert len(index.requests) == 3
+    assert index.connections == 1
+
+
+def test_thread_pool_fetcher_filters(index):
+    simple = SimpleRepository(index.url + "/simple")
+    fetcher = ThreadPoolFetcher(
+        [(simple, "pip")], filters=[VersionFilter(">=18")],
+    )
+    versions = sorted(str(entry.version) for entry in fetcher)
+    assert versions == ["18.0", "18.0", "18.1", "18.1"]
+
+
+@pytest.fixture()
+def mirror(tmpdir, read_data):
+    simple = tmpdir.mkdir("simple")
+    simple.mkdir("pip").join("index.html").write_binary(
+        read_data("simple-pip.html"),
+    )
+    simple.mkdir("six").join("index.html").write_binary(
+        b'<!DOCTYPE html><html><head><title>Links for six</title></head>'
+        b'<body><a href="../../packages/six-1.0.tar.gz#sha256=00">'
+        b'six-1.0.tar.gz</a></body></html>',
+    )
+    return simple
+
+
+def test_local_mirror(mirror):
+    repo = SimpleRepository(str(mirror))
+    pairs = [(repo, "pip"), (repo, "Six"), (repo, "does-not-exist")]
+    entries = list(ThreadPoolFetcher(pairs))
+    assert count_names(entries) == {"pip": 10, "six": 1}
+
+    six, = [entry for entry in entries if entry.name == "six"]
+    assert six.endpoint.local
+    assert six.endpoint.value == os.path.join(
+        os.path.dirname(str(mirror)), "packages", "six-1.0.tar.gz",
+    )
+    assert six.hashes == {"sha256": "00"}
+
+
+def test_local_mirror_sidecar(mirror, read_data):
+    project = mirror.join("six")
+    sidecar = project.join("index.v1_json")
+    sidecar.write_binary(read_data("simple-pip.json").replace(b"pip", b"six"))
+    os.utime(str(project.join("index.html")), (0, 0))
+
+    repo = SimpleRepository(str(mirror), sidecar="index.v1_json")
+    assert len(list(ThreadPoolFetcher([(repo, "six")]))) == 10
+
+    # A sidecar older than the page is stale, and not used.
+    os.utime(str(sidecar), (0, 0))
+    os.utime(str(project.join("index.html")), None)
+    assert len(list(ThreadPoolFetcher([(repo, "six")]))) == 1
+
+
+def test_aggregate_fetcher(index, tmpdir, read_data):
+    index.pages["/mirror/pip/"] = ("text/html", read_data("simple-pip.html"))
+    tmpdir.join("pip-18.1-py2.py3-none-any.whl").write("")
+    local = LocalDirectoryRepository(str(tmpdir))
+    simple = SimpleRepository(index.url + "/simple")
+    mirror = SimpleRepository(index.url + "/mirror")
+    missing = SimpleRepository(index.url + "/missing")
+
+    with AggregateFetcher([local, simple, mirror, missing], "pip") as fetcher:
+        entries = list(fetcher)
+
+    # The local file has no hashes, so it's not the same as the remote one.
+    # The mirror lists the same files as the index, so none is yielded.
+    assert len(entries) == 11
+    assert entries[0].endpoint.local
+    assert len(set(e.endpoint for e in entries)) == 11
+    assert sorted(path for path, _ in index.requests) == [
+        "/mirror/pip/", "/missing/pip/", "/simple/pip/",
+    ]
+
+
+def test_aggregate_fetcher_priorities(index, tmpdir):
+    tmpdir.join("pip-18.1-py2.py3-none-any.whl").write("")
+    local = LocalDirectoryRepository(str(tmpdir))
+    simple = SimpleRepository(index.url + "/simple")
+
+    entries = list(AggregateFetcher(
+        [local, simple], "pip", priorities=[1, 0],
+        filters=[VersionFilter(">=18.1")],
+    ))
+    assert [e.endpoint.local for e in entries] == [False, False, True]
+
+    with pytest.raises(ValueError):
+        AggregateFetcher([local, simple], "pip", priorities=[0])
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from packaging_repositories.filenames import (
+    FilenameMatcher, classify_filename, get_filename_matcher,
+    is_valid_version,
+)
+from packaging_repositories.utils import (
+    WHEEL_EXTENSION, WHEEL_FILENAME_RE,
+    match_egg_info_version, package_names_match, split_entry_ext,
+)
+
+
+def match_version_slowly(filename, package_name):
+    stem, ext = split_entry_ext(filename)
+    if ext == WHEEL_EXTENSION:
+        match = WHEEL_FILENAME_RE.match(filename)
+        if not match:
+            return None
+        wheel_name, version = match.group("name", "ver")
+        if not package_names_match(package_name, wheel_name):
+            return None
+    else:
+        try:
+            version = match_egg_info_version(stem, package_name)
+        except ValueError:
+            return None
+        if version is None:
+            return None
+    if not is_valid_version(version):
+        return None
+    return version
+
+
+FILENAMES = [
+    "six-1.12.0-py2.py3-none-any.whl",
+    "six-1.12.0.tar.gz",
+    "Six-1.12.0.zip",
+    "six-1.12.0.tar.bz2",
+    "six-1.12.0.whl",
+    "zope.interface-4.6.0-cp37-cp37m-win32.whl",
+    "zope.interface-4.6.0.tar.gz",
+    "zope_interface-4.6.0.tar.gz",
+    "jinja2_time-0.2.0-py2.py3-none-any.whl",
+    "jinja2-time-0.2.0.tar.gz",
+    "Jinja2_Time-0.2.0.tar.gz",
+    "foo-bar-1.0.tar.gz",
+    "foo-bar-baz.tar.gz",
+    "foo.tar.gz",
+    "README",
+]
+
+
+@pytest.mark.parametrize("package_name", [
+    "six", "SIX", "zope.interface", "zope-interface", "jinja2-time",
+    "Jinja2_Time", "foo", "foo-bar", "foo_bar",
+])
+def test_matcher_matches_slow_path(package_name):
+    matcher = FilenameMatcher(package_name)
+    expected = [match_version_slowly(f, package_name) for f in FILENAMES]
+    assert [matcher.match_version(f) for f in FILENAMES] == expected
+    assert matcher.match_many(FILENAMES) == expected
+
+
+def test_cached():
+    classify_filename.cache_clear()
+    matcher = get_filename_matcher("six")
+    assert get_filename_matcher("six") is matcher
+    matcher.match_many(FILENAMES)
+    get_filename_matcher("foo").match_many(FILENAMES)
+    info = classify_filename.cache_info()
+    assert info.misses == len(FILENAMES)
+    assert info.hits == len(FILENAMES)
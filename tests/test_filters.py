@@ -0,0 +1,185 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+
+import pytest
+
+import packaging.tags
+
+from packaging_repositories import (
+    Filter, FilterChain, RequiresPythonFilter, SimpleRepository, VersionFilter,
+    WheelTagFilter, get_target_tags,
+)
+from packaging_repositories.entries import list_from_paths
+
+
+@pytest.fixture()
+def pip_page(read_data):
+    return (read_data("simple-pip.html"), None)
+
+
+class WheelFilter(Filter):
+    def match(self, entry):
+        return entry.endpoint.value.endswith(".whl")
+
+
+@pytest.mark.parametrize(
+    ("filters", "expected"),
+    [
+        ([], 10),
+        ([VersionFilter(">=10")], 4),
+        ([RequiresPythonFilter("2.6")], 6),
+        ([VersionFilter(">=10"), RequiresPythonFilter("3.3")], 2),
+        ([VersionFilter(">=10"), WheelFilter()], 2),
+        ([VersionFilter(">=10") & RequiresPythonFilter("3.3")], 2),
+    ],
+)
+def test_pushdown_matches_wrapping(pip_page, filters, expected):
+    repo = SimpleRepository("https://pypi.org/simple")
+    endpoint, = repo.iter_endpoints("pip")
+    entries = repo.get_entries("pip", endpoint, pip_page, filters=filters)
+    assert len(entries) == expected
+
+    wrapped = iter(repo.get_entries("pip", endpoint, pip_page))
+    for f in filters:
+        wrapped = f(wrapped)
+    assert entries == list(wrapped)
+
+
+def test_chain_flattens():
+    version_filter = VersionFilter(">=10")
+    wheel_filter = WheelFilter()
+    chain = FilterChain([version_filter & RequiresPythonFilter("3.3")])
+    chain = chain & wheel_filter
+    assert len(chain.filters) == 3
+    assert chain.filters[0] is version_filter
+    assert chain.filters[-1] is wheel_filter
+
+
+def test_chain_equality():
+    wheel_filter = WheelFilter()
+    chain = VersionFilter(">=10") & RequiresPythonFilter("3.3")
+    assert chain == VersionFilter(">=10") & RequiresPythonFilter("3.3")
+    assert hash(chain) == hash(
+        VersionFilter(">=10") & RequiresPythonFilter("3.3"),
+    )
+    assert chain != VersionFilter(">=11") & RequiresPythonFilter("3.3")
+    assert VersionFilter(">=10") != RequiresPythonFilter("10")
+
+    # Other filters are only equal to themselves.
+    assert chain & wheel_filter == chain & wheel_filter
+    assert chain & wheel_filter != chain & WheelFilter()
+
+
+LINUX_TAGS = [
+    "cp38-cp38-manylinux2014_x86_64",
+    "cp38-abi3-manylinux2014_x86_64",
+    "py3-none-manylinux2014_x86_64",
+    "py3-none-any",
+]
+
+
+def list_names(entries):
+    return sorted(os.path.basename(e.endpoint.value) for e in entries)
+
+
+@pytest.fixture()
+def wheels():
+    return list_from_paths([
+        "foo-1.0.tar.gz",
+        "foo-1.0-cp38-cp38-manylinux2014_x86_64.whl",
+        "foo-1.0-cp38-cp38-win_amd64.whl",
+        "foo-1.0-cp37.cp38-abi3-manylinux2014_x86_64.whl",
+        "foo-1.0-py2.py3-none-any.whl",
+        "foo-1.0-py2-none-any.whl",
+    ], "/wheels", "foo")
+
+
+def test_wheel_tag_filter(wheels):
+    tag_filter = WheelTagFilter(LINUX_TAGS)
+    assert list_names(tag_filter(iter(wheels))) == [
+        "foo-1.0-cp37.cp38-abi3-manylinux2014_x86_64.whl",
+        "foo-1.0-cp38-cp38-manylinux2014_x86_64.whl",
+        "foo-1.0-py2.py3-none-any.whl",
+        "foo-1.0.tar.gz",
+    ]
+    ranks = {
+        os.path.basename(e.endpoint.value): tag_filter.get_rank(e)
+        for e in wheels
+    }
+    assert ranks == {
+        "foo-1.0.tar.gz": None,
+        "foo-1.0-cp38-cp38-manylinux2014_x86_64.whl": 0,
+        "foo-1.0-cp38-cp38-win_amd64.whl": None,
+        "foo-1.0-cp37.cp38-abi3-manylinux2014_x86_64.whl": 1,
+        "foo-1.0-py2.py3-none-any.whl": 3,
+        "foo-1.0-py2-none-any.whl": None,
+    }
+
+
+def test_wheel_tag_filter_pushdown(wheels):
+    tag_filter = WheelTagFilter(
+        packaging.tags.Tag(*tag.split("-")) for tag in LINUX_TAGS
+    )
+    entries = list_from_paths(
+        [os.path.basename(e.endpoint.value) for e in wheels], "/wheels",
+        "foo", filters=[VersionFilter(">=1"), tag_filter],
+    )
+    assert list_names(entries) == list_names(tag_filter(iter(wheels)))
+
+
+def test_wheel_tag_filter_url():
+    tag_filter = WheelTagFilter(["py3-none-any"])
+    page = (
+        b'<a href="https://example.com/foo-1.0-py3-none-any.whl#md5=1">'
+        b'foo-1.0-py3-none-any.whl</a>'
+        b'<a href="https://example.com/foo-1.0-py2-none-any.whl?x=y">'
+        b'foo-1.0-py2-none-any.whl</a>'
+    )
+    repo = SimpleRepository("https://example.com/simple")
+    entries = list(repo.get_entries(
+        "foo", next(repo.iter_endpoints("foo")), (page, "utf-8"),
+        filters=[tag_filter],
+    ))
+    assert [tag_filter.get_rank(e) for e in entries] == [0]
+
+
+def test_wheel_tag_filter_default():
+    tag = next(iter(packaging.tags.sys_tags()))
+    wheel = "foo-1.0-{0}.whl".format(tag)
+    entry, = list_from_paths([wheel], "/wheels", "foo")
+    assert WheelTagFilter().get_rank(entry) == 0
+
+
+def test_get_target_tags():
+    tags = get_target_tags(
+        python_version=(3, 8), implementation="cp",
+        platforms=["manylinux2014_x86_64"],
+    )
+    strings = [str(tag) for tag in tags]
+    assert strings[0] == "cp38-cp38-manylinux2014_x86_64"
+    assert "cp38-abi3-manylinux2014_x86_64" in strings
+    assert "py3-none-any" in strings
+    assert not any("win" in tag for tag in strings)
+
+    tags = get_target_tags(
+        python_version=(3, 9), implementation="pp",
+        platforms=["manylinux2014_x86_64"],
+    )
+    assert [str(tag) for tag in tags[:4]] == [
+        "pp39-none-manylinux2014_x86_64",
+        "py39-none-manylinux2014_x86_64",
+        "py3-none-manylinux2014_x86_64",
+        "py38-none-manylinux2014_x86_64",
+    ]
+    assert not any("cp" in str(tag) for tag in tags)
+
+    tags = get_target_tags(
+        python_version=(3, 9), implementation="pp", abis=["pypy39_pp73"],
+        platforms=["manylinux2014_x86_64"],
+    )
+    assert [str(tag) for tag in tags[:2]] == [
+        "pp39-pypy39_pp73-manylinux2014_x86_64",
+        "pp39-none-manylinux2014_x86_64",
+    ]
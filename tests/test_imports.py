@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import subprocess
+import sys
+
+import pytest
+
+
+# Modules that are slow to import, and should only be imported when the
+# feature needing them is first used.
+DEFERRED_MODULES = [
+    "asyncio", "cgi", "html5lib", "http.client", "httplib",
+    "multiprocessing.pool", "packaging.specifiers", "sqlite3", "ssl",
+]
+
+
+def get_imported_modules(code):
+    """Get names of modules imported by running `code` in a new interpreter.
+
+    This parses the output of ``python -X importtime``, which lists every
+    module imported, with the time spent on it.
+    """
+    output = subprocess.check_output(
+        [sys.executable, "-X", "importtime", "-c", code],
+        stderr=subprocess.STDOUT,
+    ).decode("utf-8")
+    return {
+        line.rsplit("|", 1)[-1].strip()
+        for line in output.splitlines()
+        if line.startswith("import time:")
+    }
+
+
+pytestmark = pytest.mark.skipif(
+    sys.version_info < (3, 7), reason="-X importtime needs Python 3.7",
+)
+
+
+def test_import_defers_heavy_modules():
+    modules = get_imported_modules("import packaging_repositories")
+    assert "packaging_repositories.entries" in modules
+    assert modules.isdisjoint(DEFERRED_MODULES)
+
+
+def test_list_directory_defers_heavy_modules():
+    modules = get_imported_modules(
+        "from packaging_repositories import *; "
+        "from packaging_repositories.entries import list_from_paths; "
+        "list_from_paths(['pip-1.0.tar.gz'], '.', 'pip')[0].version",
+    )
+    assert modules.isdisjoint(DEFERRED_MODULES)
+
+
+def test_stdlib_parser_defers_heavy_modules():
+    modules = get_imported_modules(
+        "from packaging_repositories.entries import parse_from_html; "
+        "parse_from_html('<a href=pip-1.0.tar.gz>pip-1.0.tar.gz</a>', "
+        "'https://a/', 'pip', 'stdlib')[0].version",
+    )
+    assert modules.isdisjoint(DEFERRED_MODULES)
+
+
+@pytest.mark.parametrize("code, module", [
+    ("VersionFilter('>=1')", "packaging.specifiers"),
+    ("parse_from_html('', 'https://a/', 'pip', 'html5lib')", "html5lib"),
+    ("EntryStore(':memory:').clear()", "sqlite3"),
+])
+def test_import_on_first_use(code, module):
+    modules = get_imported_modules(
+        "from packaging_repositories import EntryStore, VersionFilter; "
+        "from packaging_repositories.entries import parse_from_html; " + code,
+    )
+    assert module in modules
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from packaging_repositories import (
+    Endpoint, EntryStore, FlatHTMLRepository, Metrics, ResponseCache,
+    SimpleRepository, ThreadPoolFetcher, Transport, VersionFilter,
+)
+from packaging_repositories.entries import list_from_paths, parse_from_html
+
+
+PAGE_URL = "https://pypi.org/simple/pip/"
+
+
+def test_parse_from_html(read_data):
+    metrics = Metrics()
+    entries = parse_from_html(
+        (read_data("simple-pip.html"), "utf-8"), PAGE_URL, "pip",
+        filters=[VersionFilter(">=18")], instrument=metrics,
+    )
+
+    endpoint = metrics.endpoints[PAGE_URL]
+    assert endpoint.parses == 1
+    assert endpoint.candidates == 10
+    assert endpoint.entries == len(entries) == 4
+    assert set(endpoint.parse_seconds) == {"tokenize", "entries"}
+
+    checked, rejected = metrics.filters["version"]
+    assert (checked, rejected) == (10, 6)
+
+
+def test_parse_unchanged(read_data):
+    source = (read_data("simple-pip.html"), "utf-8")
+    expected = parse_from_html(source, PAGE_URL, "pip")
+    assert parse_from_html(
+        source, PAGE_URL, "pip", instrument=Metrics(),
+    ) == expected
+
+
+def test_wrapped_filter(read_data):
+    metrics = Metrics()
+    entries = parse_from_html(
+        (read_data("simple-pip.html"), "utf-8"), PAGE_URL, "pip",
+    )
+    version_filter = VersionFilter(">=18")
+    wrapped = version_filter(iter(entries), instrument=metrics)
+    assert list(wrapped) == list(version_filter(iter(entries)))
+    assert metrics.filters["wrapped"] == [10, 6]
+
+
+def test_list_from_paths():
+    metrics = Metrics()
+    paths = ["pip-18.0.tar.gz", "pip-18.0-py2.py3-none-any.whl", "six-1.0.zip"]
+    entries = list_from_paths(paths, "/files", "pip", instrument=metrics)
+
+    endpoint = metrics.endpoints["/files"]
+    assert endpoint.candidates == 3
+    assert endpoint.entries == len(entries) == 2
+    assert not metrics.filters
+
+
+def test_entry_store_hit_rate(tmpdir, read_data):
+    metrics = Metrics()
+    assert metrics.get_hit_rate("entries") is None
+
+    store = EntryStore(str(tmpdir.join("entries.db")))
+    source = (read_data("simple-pip.html"), "utf-8")
+    for _ in range(4):
+        parse_from_html(
+            source, PAGE_URL, "pip", store=store, instrument=metrics,
+        )
+    store.close()
+
+    assert metrics.caches["entries"] == [3, 1]
+    assert metrics.get_hit_rate("entries") == 0.75
+    assert metrics.endpoints[PAGE_URL].parses == 1
+
+
+def test_flat_index(read_data):
+    metrics = Metrics()
+    repo = FlatHTMLRepository("https://example.com/links", instrument=metrics)
+    endpoint = Endpoint(False, "https://example.com/links")
+    source = (read_data("links.html"), "utf-8")
+    for name in ["pip", "six"]:
+        repo.get_entries(name, endpoint, source)
+
+    location = endpoint.as_url()
+    assert metrics.endpoints[location].parses == 1
+    assert set(metrics.endpoints[location].parse_seconds) == {"tokenize"}
+
+
+def test_thread_pool_fetcher(pip_index, tmpdir, read_data):
+    metrics = Metrics()
+    repo = SimpleRepository(pip_index.url + "/simple", instrument=metrics)
+    transport = Transport(
+        cache=ResponseCache(str(tmpdir)), instrument=metrics,
+    )
+    for _ in range(2):
+        fetcher = ThreadPoolFetcher(
+            [(repo, "pip")], transport, instrument=metrics,
+        )
+        assert len(list(fetcher)) == 10
+    transport.close()
+
+    url = pip_index.url + "/simple/pip/"
+    endpoint = metrics.endpoints[url]
+    assert endpoint.requests == 2
+    assert endpoint.bytes == len(read_data("simple-pip.html"))
+    assert endpoint.yielded == 20
+    assert endpoint.parses == 2
+    assert metrics.caches["responses"] == [1, 1]
+
+    snapshot = metrics.as_dict()
+    assert snapshot["endpoints"][url]["requests"] == 2
+    assert snapshot["caches"]["responses"] == {"hits": 1, "misses": 1}
+    assert "intern_caches" in snapshot
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+
+import pytest
+
+from packaging_repositories import (
+    BestEntries, Filter, LocalDirectoryRepository, SimpleRepository, best,
+    latest_matching,
+)
+from packaging_repositories.entries import list_from_paths
+
+
+def make_entries(*filenames):
+    return list_from_paths(filenames, "/files", "pip")
+
+
+def test_best_entries():
+    best_entries = BestEntries(n=2)
+    best_entries.extend(make_entries(
+        "pip-1.0.tar.gz", "pip-3.0.tar.gz", "pip-2.0.tar.gz",
+        "pip-3.0-py3-none-any.whl", "pip-0.1.tar.gz",
+    ))
+    assert best_entries.full
+
+    # On ties, the entry added first wins.
+    entries = best_entries.get_entries()
+    assert [os.path.basename(e.endpoint.value) for e in entries] == [
+        "pip-3.0.tar.gz", "pip-3.0-py3-none-any.whl",
+    ]
+
+
+def test_best_entries_key():
+    best_entries = BestEntries(key=lambda entry: -len(entry.endpoint.value))
+    best_entries.extend(make_entries("pip-1.0.tar.gz", "pip-10.0.tar.gz"))
+    assert [str(e.version) for e in best_entries.get_entries()] == ["1.0"]
+
+
+def test_best_entries_invalid():
+    with pytest.raises(ValueError):
+        BestEntries(n=0)
+
+
+def test_best(pip_index, tmpdir):
+    tmpdir.join("pip-1.0.tar.gz").write("")
+    local = LocalDirectoryRepository(str(tmpdir))
+    simple = SimpleRepository(pip_index.url + "/simple")
+
+    # The local entry ranks first, even though remote ones are newer.
+    entries = best([local, simple], "pip", n=3)
+    assert [str(e.version) for e in entries] == ["1.0", "18.1", "18.1"]
+    assert len(pip_index.requests) == 1
+
+    # Enough entries are found locally, so the index is not fetched.
+    entries = best([local, simple], "pip")
+    assert [str(e.version) for e in entries] == ["1.0"]
+    assert len(pip_index.requests) == 1
+
+
+def test_latest_matching(pip_index, tmpdir):
+    tmpdir.join("pip-1.0.tar.gz").write("")
+    local = LocalDirectoryRepository(str(tmpdir))
+    simple = SimpleRepository(pip_index.url + "/simple")
+
+    entries = latest_matching([local, simple], "pip", "<18.1")
+    assert [str(e.version) for e in entries] == ["1.0"]
+    assert not pip_index.requests
+
+    entries = latest_matching([local, simple], "pip", ">1,<18.1")
+    assert sorted(str(e.version) for e in entries) == ["18.0", "18.0"]
+
+    assert latest_matching([local, simple], "pip", ">=19") == []
+
+
+class SdistFilter(Filter):
+    def match(self, entry):
+        return entry.endpoint.value.endswith(".tar.gz")
+
+
+def test_latest_matching_filters(tmpdir):
+    for name in ["pip-1.0.tar.gz", "pip-2.0-py3-none-any.whl", "pip-3.0.zip"]:
+        tmpdir.join(name).write("")
+    local = LocalDirectoryRepository(str(tmpdir))
+    entries = latest_matching(
+        [local], "pip", "<3", filters=[SdistFilter()],
+    )
+    assert [str(e.version) for e in entries] == ["1.0"]
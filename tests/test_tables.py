@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import itertools
+
+import pytest
+
+from packaging.version import Version
+from packaging_repositories import Endpoint, Entry, EntryTable, VersionFilter
+
+
+VERSIONS = [
+    "0.9", "1.0.dev0", "1.0a1", "1.0", "1.0+local", "1.0.0+abc",
+    "1.0.post1", "1.1", "1.1.1", "1.2rc1", "2.0", "2.0.1", "1!0.5",
+]
+
+
+def make_entries():
+    entries = []
+    for version, ext in itertools.product(VERSIONS, [".tar.gz", ".zip"]):
+        url = "https://example.com/foo-{0}{1}".format(version, ext)
+        entries.append(Entry(
+            "foo", Version(version), Endpoint(False, url),
+            {"sha256": "0" * 64}, None, "",
+        ))
+    return entries[::-1]    # Unsorted on purpose.
+
+
+def test_round_trip():
+    entries = make_entries()
+    table = EntryTable(entries)
+    assert len(table) == len(entries)
+    assert table.to_entries() == entries
+    assert table[3] == entries[3]
+    assert table[-2:] == entries[-2:]
+
+
+@pytest.mark.parametrize("specifier", [
+    "", ">=1.0", ">1.0", "<1.1", "<=1.0", "==1.0", "==1.0+local", "==1.*",
+    "==1.0.0", "<=1.0.0", "==1.0.0+abc", "~=1.0", "~=1.1.0", "!=1.0",
+    ">=1.0,<2", ">1.0.dev0", ">=1!0", ">=1.0a1", "<=2.0.1,>=2", "===1.1",
+])
+def test_select(specifier):
+    entries = make_entries()
+    expected = sorted(
+        VersionFilter(specifier)(iter(entries)),
+        key=lambda entry: entry.version,
+    )
+    result = EntryTable(entries).select(specifier)
+    assert [(e.version, e.endpoint) for e in result] == [
+        (e.version, e.endpoint) for e in expected
+    ]
+
+
+def test_latest():
+    table = EntryTable(make_entries())
+    latest = table.latest(2, "<1.2")
+    assert [str(e.version) for e in latest] == ["1.1.1"] * 2 + ["1.1"] * 2
+    assert [str(e.version) for e in table.latest()] == ["1!0.5"] * 2
+    assert table.latest(3, "<0.1") == []